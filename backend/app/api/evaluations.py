@@ -0,0 +1,57 @@
+import json
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request
+from typing import Dict
+from app.db.storage import get_phase_timings, get_all_phase_timings
+from app.db import data_version
+from app.utils.http_cache import cached_json_response
+
+router = APIRouter()
+
+@router.get("/evaluations/timings/summary")
+async def get_timings_summary(request: Request):
+    # Completed and failed evaluations both finish with a queue status write
+    return await cached_json_response(
+        request,
+        data_version.QUEUE,
+        build_timings_summary_body,
+        key="evaluations:timings:summary"
+    )
+
+async def build_timings_summary_body() -> bytes:
+    return json.dumps(summarise_timings(await get_all_phase_timings())).encode()
+
+def summarise_timings(all_timings: Dict[str, Dict]) -> Dict:
+    """Per-phase percentiles across the latest evaluation of every team, completed or failed."""
+    durations: Dict[str, list] = {'total': []}
+    outcomes: Dict[str, int] = {}
+    for timings in all_timings.values():
+        outcome = timings.get('outcome') or 'completed'
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        durations['total'].append(timings.get('total_ms', 0.0))
+        for phase, duration_ms in (timings.get('phases') or {}).items():
+            durations.setdefault(phase, []).append(duration_ms)
+    
+    phases = {}
+    for phase, values in durations.items():
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(np.asarray(values, dtype=float), [50, 95, 99])
+        phases[phase] = {
+            'count': len(values),
+            'mean_ms': float(np.mean(values)),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99)
+        }
+    
+    return {"teams": len(all_timings), "outcomes": outcomes, "phases": phases}
+
+@router.get("/evaluations/{team_id}/timings")
+async def get_evaluation_timings(team_id: str):
+    timings = await get_phase_timings(team_id)
+    
+    if not timings:
+        raise HTTPException(status_code=404, detail="No timings recorded for this team")
+    
+    return {"team_id": team_id, **timings}
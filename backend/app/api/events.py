@@ -0,0 +1,227 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional, Set
+from app.db.models import QueueStatus, QueueStatusResponse
+from app.db.storage import get_active_queue, get_queue_status
+from app.db import data_version
+from app.api.leaderboard import leaderboard_snapshot
+from app.api.status import estimated_wait_time
+from app.config import (
+    LIVE_UPDATES_DEBOUNCE_MS, LIVE_UPDATES_REFRESH_SECONDS,
+    LIVE_UPDATES_HEARTBEAT_SECONDS, LIVE_UPDATES_QUEUE_SIZE
+)
+
+router = APIRouter()
+
+FINAL_STATUSES = (QueueStatus.COMPLETED.value, QueueStatus.FAILED.value)
+
+class Subscriber:
+    def __init__(self, team_id: Optional[str], leaderboard: bool):
+        self.team_id = team_id
+        self.leaderboard = leaderboard
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_UPDATES_QUEUE_SIZE)
+        # A client that falls this far behind is disconnected and resyncs on reconnect
+        self.overflowed = False
+    
+    def send(self, event: str, data):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+# One publisher per process: storage bumps mark scopes dirty, and each change is
+# read once and fanned out to every open stream
+subscribers: Set[Subscriber] = set()
+dirty: Set[str] = set()
+team_states: Dict[str, Dict] = {}
+leaderboard_entries: Dict[str, Dict] = {}
+publisher = {'loop': None, 'wakeup': None, 'task': None}
+
+def _mark_dirty(scopes):
+    dirty.update(scopes)
+    publisher['wakeup'].set()
+
+def _on_bump(scopes):
+    # Bumps come from storage threads as well as the event loop
+    loop = publisher['loop']
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(_mark_dirty, scopes)
+
+def queue_state(team_id: str, status: Optional[str], position: Optional[int] = None, failure_reason: Optional[str] = None) -> Dict:
+    if status is None:
+        return {'team_id': team_id, 'status': None, 'position': None, 'estimated_wait_time': None, 'failure_reason': None}
+    return QueueStatusResponse(
+        team_id=team_id,
+        status=status,
+        position=position,
+        estimated_wait_time=estimated_wait_time(position),
+        failure_reason=failure_reason
+    ).model_dump(mode='json')
+
+async def read_team_state(team_id: str) -> Dict:
+    entry = await get_queue_status(team_id)
+    if not entry:
+        return queue_state(team_id, None)
+    return queue_state(team_id, entry.status, entry.position, entry.failure_reason)
+
+def send_team_state(team_id: str, state: Dict):
+    if team_states.get(team_id) == state:
+        return
+    team_states[team_id] = state
+    for subscriber in list(subscribers):
+        if subscriber.team_id == team_id:
+            subscriber.send('queue', state)
+
+async def publish_queue():
+    watched = {subscriber.team_id for subscriber in subscribers if subscriber.team_id}
+    if not watched:
+        return
+    
+    # One read of the active queue covers every watched team's position
+    queued, evaluating = await get_active_queue()
+    positions = {team_id: index + 1 for index, team_id in enumerate(queued)}
+    evaluating = set(evaluating)
+    
+    for team_id in watched:
+        if team_id in positions:
+            state = queue_state(team_id, QueueStatus.QUEUED.value, positions[team_id])
+        elif team_id in evaluating:
+            state = queue_state(team_id, QueueStatus.EVALUATING.value)
+        else:
+            previous = team_states.get(team_id)
+            if previous and previous['status'] in FINAL_STATUSES:
+                continue
+            # Left the active queue since the last update: read the outcome once
+            state = await read_team_state(team_id)
+        send_team_state(team_id, state)
+
+async def publish_leaderboard():
+    if not any(subscriber.leaderboard for subscriber in subscribers):
+        return
+    
+    # Shares the ranked snapshot that /leaderboard serves from
+    current = {entry['team_id']: entry for entry in (await leaderboard_snapshot())['entries']}
+    changed = [entry for team_id, entry in current.items() if leaderboard_entries.get(team_id) != entry]
+    removed = [team_id for team_id in leaderboard_entries if team_id not in current]
+    
+    leaderboard_entries.clear()
+    leaderboard_entries.update(current)
+    
+    if changed or removed:
+        delta = {'changed': changed, 'removed': removed, 'total': len(current)}
+        for subscriber in list(subscribers):
+            if subscriber.leaderboard:
+                subscriber.send('leaderboard_delta', delta)
+
+async def run_publisher():
+    wakeup = publisher['wakeup']
+    while True:
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=LIVE_UPDATES_REFRESH_SECONDS)
+            # Let a burst of writes settle into one update
+            await asyncio.sleep(LIVE_UPDATES_DEBOUNCE_MS / 1000)
+        except asyncio.TimeoutError:
+            # Writes made by other processes never bump this process's versions
+            dirty.update((data_version.QUEUE, data_version.LEADERBOARD))
+        
+        wakeup.clear()
+        scopes = set(dirty)
+        dirty.clear()
+        
+        if not subscribers:
+            continue
+        
+        try:
+            if data_version.QUEUE in scopes:
+                await publish_queue()
+            if data_version.LEADERBOARD in scopes:
+                await publish_leaderboard()
+        except Exception as e:
+            print(f"Error publishing live updates: {e}")
+
+def start_publisher():
+    publisher['loop'] = asyncio.get_running_loop()
+    publisher['wakeup'] = asyncio.Event()
+    data_version.add_listener(_on_bump)
+    publisher['task'] = asyncio.create_task(run_publisher())
+
+async def stop_publisher():
+    data_version.remove_listener(_on_bump)
+    publisher['loop'] = None
+    task = publisher['task']
+    if task:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        publisher['task'] = None
+
+async def subscribe(team_id: Optional[str], leaderboard: bool) -> Subscriber:
+    subscriber = Subscriber(team_id, leaderboard)
+    
+    state = None
+    if team_id and team_id not in team_states:
+        state = await read_team_state(team_id)
+    entries = None
+    if leaderboard and not leaderboard_entries:
+        entries = (await leaderboard_snapshot())['entries']
+    
+    # No awaits from here on: the initial state is exactly what the next deltas build on
+    if state is not None and team_id not in team_states:
+        team_states[team_id] = state
+    if entries is not None and not leaderboard_entries:
+        leaderboard_entries.update({entry['team_id']: entry for entry in entries})
+    
+    if team_id:
+        subscriber.send('queue', team_states[team_id])
+    if leaderboard:
+        current = list(leaderboard_entries.values())
+        subscriber.send('leaderboard', {'entries': current, 'total': len(current)})
+    
+    subscribers.add(subscriber)
+    return subscriber
+
+def unsubscribe(subscriber: Subscriber):
+    subscribers.discard(subscriber)
+    # State nobody is listening to is no longer kept current
+    if subscriber.team_id and not any(other.team_id == subscriber.team_id for other in subscribers):
+        team_states.pop(subscriber.team_id, None)
+    if not any(other.leaderboard for other in subscribers):
+        leaderboard_entries.clear()
+
+def format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/events")
+async def stream_events(team_id: Optional[str] = None, leaderboard: bool = True):
+    """Server-sent events: 'queue' for the team's status and place in line, 'leaderboard' once on connect, then 'leaderboard_delta'."""
+    if publisher['task'] is None:
+        raise HTTPException(status_code=503, detail="Live updates are not available")
+    if not team_id and not leaderboard:
+        raise HTTPException(status_code=400, detail="Nothing to subscribe to")
+    
+    subscriber = await subscribe(team_id, leaderboard)
+    
+    async def stream():
+        try:
+            while not subscriber.overflowed:
+                try:
+                    event, data = await asyncio.wait_for(subscriber.queue.get(), timeout=LIVE_UPDATES_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event, data)
+        finally:
+            unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,17 +1,116 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from app.db.models import LeaderboardEntry, TeamResultResponse, QueueStatus
-from app.db.firebase_service import get_leaderboard, get_team_result
+import asyncio
+import base64
+import json
+import time
+from bisect import bisect_right
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Dict, List, Optional, Union
+from app.db.models import LeaderboardEntry, LeaderboardPage, TeamResultResponse, QueueStatus
+from app.db.records import leaderboard_sort_key
+from app.db.storage import get_leaderboard, get_team_result
+from app.db import data_version
+from app.utils.http_cache import cached_json_response
+from app.config import LEADERBOARD_DEFAULT_PAGE_SIZE, LEADERBOARD_MAX_PAGE_SIZE, HTTP_CACHE_REVALIDATE_SECONDS
 
 router = APIRouter()
 
-@router.get("/leaderboard", response_model=List[LeaderboardEntry])
-async def get_leaderboard_data():
-    return get_leaderboard()
+# Ranked, JSON-ready entries and their sort keys, rebuilt only when the leaderboard changes
+snapshot = {'version': None, 'built_at': 0.0, 'entries': [], 'keys': []}
+snapshot_lock = asyncio.Lock()
+
+IDENTITY_FIELDS = ('rank', 'team_id')
+
+async def leaderboard_snapshot() -> Dict:
+    async with snapshot_lock:
+        version = data_version.current(data_version.LEADERBOARD)
+        stale = time.monotonic() - snapshot['built_at'] > HTTP_CACHE_REVALIDATE_SECONDS
+        if snapshot['version'] != version or stale:
+            entries = [entry.model_dump(mode='json') for entry in await get_leaderboard()]
+            snapshot.update(
+                version=version,
+                built_at=time.monotonic(),
+                entries=entries,
+                keys=[leaderboard_sort_key(entry) for entry in entries]
+            )
+        return snapshot
+
+def encode_cursor(entry: Dict) -> str:
+    key = [entry['accuracy'], entry['f1_score'], entry['latency_ms'], entry['team_id']]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str):
+    try:
+        accuracy, f1_score, latency_ms, team_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return leaderboard_sort_key({'accuracy': accuracy, 'f1_score': f1_score, 'latency_ms': latency_ms, 'team_id': team_id})
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in LeaderboardEntry.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown leaderboard fields: {', '.join(unknown)}")
+    return list(IDENTITY_FIELDS) + [field for field in requested if field not in IDENTITY_FIELDS]
+
+def project(entries: List[Dict], fields: Optional[List[str]]) -> List[Dict]:
+    if fields is None:
+        return entries
+    return [{field: entry[field] for field in fields} for entry in entries]
+
+def dump(value) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode()
+
+@router.get("/leaderboard", response_model=Union[List[LeaderboardEntry], LeaderboardPage])
+async def get_leaderboard_data(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=LEADERBOARD_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    top_k: Optional[int] = Query(None, ge=1, le=LEADERBOARD_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated entry fields to return; rank and team_id are always included")
+):
+    """
+    Without paging parameters the full ranked list is returned. top_k returns the first k entries as a list;
+    limit/cursor return a LeaderboardPage whose next_cursor continues after the page's last entry.
+    """
+    if top_k is not None and (limit is not None or cursor is not None):
+        raise HTTPException(status_code=400, detail="top_k cannot be combined with limit or cursor")
+    
+    return await cached_json_response(
+        request,
+        data_version.LEADERBOARD,
+        lambda: build_leaderboard(limit, cursor, top_k, fields),
+        key=f"leaderboard:{top_k}:{limit}:{cursor}:{fields}"
+    )
+
+async def build_leaderboard(limit: Optional[int], cursor: Optional[str], top_k: Optional[int], fields: Optional[str]) -> bytes:
+    projection = parse_fields(fields)
+    start_after = decode_cursor(cursor) if cursor is not None else None
+    current = await leaderboard_snapshot()
+    entries = current['entries']
+    
+    if top_k is not None:
+        return dump(project(entries[:top_k], projection))
+    
+    if limit is None and cursor is None:
+        return dump(project(entries, projection))
+    
+    # Keyset pagination: the page starts after the cursor's position even if entries moved in between
+    start = bisect_right(current['keys'], start_after) if start_after is not None else 0
+    page = entries[start:start + (limit or LEADERBOARD_DEFAULT_PAGE_SIZE)]
+    has_more = start + len(page) < len(entries)
+    
+    return dump({
+        'entries': project(page, projection),
+        'total': len(entries),
+        'next_cursor': encode_cursor(page[-1]) if page and has_more else None
+    })
 
 @router.get("/team-result/{team_id}", response_model=TeamResultResponse)
 async def get_team_result_data(team_id: str):
-    result = get_team_result(team_id)
+    result = await get_team_result(team_id)
     
     if not result:
         raise HTTPException(status_code=404, detail="Team not found")
@@ -20,9 +119,20 @@ async def get_team_result_data(team_id: str):
         team_id=result["team_id"],
         team_name=result["team_name"],
         rank=result.get("rank"),
+        percentile=result.get("percentile"),
+        total_ranked=result.get("total_ranked"),
+        neighbours=result.get("neighbours", []),
         accuracy=result.get("accuracy"),
         f1_score=result.get("f1_score"),
         latency_ms=result.get("latency_ms"),
+        request_latency_p50_ms=result.get("request_latency_p50_ms"),
+        request_latency_p95_ms=result.get("request_latency_p95_ms"),
+        request_latency_p99_ms=result.get("request_latency_p99_ms"),
+        batch_count=result.get("batch_count"),
+        precision=result.get("precision"),
+        recall=result.get("recall"),
+        mcc=result.get("mcc"),
+        balanced_accuracy=result.get("balanced_accuracy"),
         status=QueueStatus(result["status"]) if result.get("status") else QueueStatus.QUEUED,
         evaluated_at=result.get("evaluated_at")
     )
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.db.storage import get_queue_length
+from app.utils.metrics import queue_length, render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of the evaluation pipeline metrics."""
+    # Queue length lives in storage, so it is read once per scrape rather than tracked on every change
+    try:
+        queue_length.set(await get_queue_length())
+    except Exception as e:
+        print(f"Error reading queue length for metrics: {e}")
+    
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, HTTPException
+import json
+from fastapi import APIRouter, HTTPException, Request
 from typing import List, Dict, Optional
-from app.db.firebase_service import get_plagiarism_data, get_all_plagiarism_flags
+from app.db.storage import get_plagiarism_data, get_all_plagiarism_flags
 from app.db.models import PlagiarismSummary
+from app.db import data_version
+from app.utils.http_cache import cached_json_response
 
 router = APIRouter()
 
 @router.get("/plagiarism/{team_id}")
 async def get_team_plagiarism(team_id: str):
-    plagiarism_data = get_plagiarism_data(team_id)
+    plagiarism_data = await get_plagiarism_data(team_id)
     
     if not plagiarism_data:
         return {
@@ -24,8 +27,18 @@ async def get_team_plagiarism(team_id: str):
     }
 
 @router.get("/plagiarism-summary")
-async def get_plagiarism_summary():
-    flags = get_all_plagiarism_flags()
+async def get_plagiarism_summary(request: Request):
+    return await cached_json_response(
+        request,
+        data_version.PLAGIARISM,
+        build_plagiarism_summary_body
+    )
+
+async def build_plagiarism_summary_body() -> bytes:
+    return json.dumps(await build_plagiarism_summary()).encode()
+
+async def build_plagiarism_summary() -> Dict:
+    flags = await get_all_plagiarism_flags()
     
     total_teams = len(flags)
     flagged_teams = sum(1 for is_flagged in flags.values() if is_flagged)
@@ -1,25 +1,48 @@
-from fastapi import APIRouter, HTTPException
+import math
+from fastapi import APIRouter, HTTPException, Request
+from typing import Optional
 from app.db.models import QueueStatusResponse
-from app.db.firebase_service import get_queue_status
-from app.config import QUEUE_CHECK_INTERVAL
+from app.db.storage import get_queue_status
+from app.db import data_version
+from app.utils.http_cache import cached_json_response
+from app.utils.metrics import evaluation_duration
+from app.config import MAX_CONCURRENT_EVALUATIONS
 
 router = APIRouter()
 
 @router.get("/queue-status/{team_id}", response_model=QueueStatusResponse)
-async def get_status(team_id: str):
-    queue_entry = get_queue_status(team_id)
+async def get_status(request: Request, team_id: str):
+    return await cached_json_response(
+        request,
+        data_version.QUEUE,
+        lambda: build_status_body(team_id),
+        key=data_version.queue_key(team_id),
+        private=True
+    )
+
+async def build_status_body(team_id: str) -> bytes:
+    return (await build_status(team_id)).model_dump_json().encode()
+
+async def build_status(team_id: str) -> QueueStatusResponse:
+    queue_entry = await get_queue_status(team_id)
     
     if not queue_entry:
         raise HTTPException(status_code=404, detail="Team not found in queue")
     
-    estimated_wait = None
-    if queue_entry.position and queue_entry.position > 1:
-        estimated_wait = (queue_entry.position - 1) * QUEUE_CHECK_INTERVAL
-    
     return QueueStatusResponse(
         team_id=queue_entry.team_id,
         status=queue_entry.status,
         position=queue_entry.position,
-        estimated_wait_time=estimated_wait,
+        estimated_wait_time=estimated_wait_time(queue_entry.position),
         failure_reason=queue_entry.failure_reason
     )
+
+def estimated_wait_time(position: Optional[int]) -> Optional[int]:
+    """Seconds until evaluation starts: the teams ahead run MAX_CONCURRENT_EVALUATIONS at a time, each taking the measured mean."""
+    if not position or position <= 1:
+        return None
+    # None until this process has finished an evaluation to measure
+    mean_duration = evaluation_duration.mean()
+    if mean_duration is None:
+        return None
+    return math.ceil(math.ceil((position - 1) / MAX_CONCURRENT_EVALUATIONS) * mean_duration)
@@ -9,15 +9,10 @@ async def test_auth(request: Request):
     headers = dict(request.headers)
     auth_header = headers.get('authorization', 'NOT FOUND')
     
-    print(f"All headers: {headers}")
-    print(f"Authorization header: {auth_header}")
-    
     if auth_header and auth_header != 'NOT FOUND':
         try:
             # Extract token (remove 'Bearer ' prefix if present)
             token = auth_header.replace('Bearer ', '').replace('bearer ', '')
-            print(f"Extracted token: {token[:50]}...")
-            
             # Try to verify with Firebase
             decoded = firebase_auth.verify_id_token(token)
             print(f"Token verified! User: {decoded.get('email')}")
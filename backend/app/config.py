@@ -1,14 +1,85 @@
 import os
+import socket
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 X_TEST_PATH = os.path.join(DATA_DIR, "X_test.csv")
 Y_TRUE_PATH = os.path.join(DATA_DIR, "y_true.csv")
 FIREBASE_CREDENTIALS_PATH = os.path.join(DATA_DIR, "portal-11326-firebase-adminsdk-fbsvc-2cd1059886.json")
 
+# "firebase" stores everything in Firestore; "sqlite" keeps it in a local file for single-node runs and load tests
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firebase").lower()
+DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(DATA_DIR, "portal.db"))
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
 EVALUATION_TIMEOUT = 30
+# "single" sends the whole test set in one request; "chunked" splits it into batches sent concurrently
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "single")
+EVALUATION_BATCH_SIZE = int(os.getenv("EVALUATION_BATCH_SIZE", "100"))
+EVALUATION_BATCH_CONCURRENCY = int(os.getenv("EVALUATION_BATCH_CONCURRENCY", "4"))
+# Latency benchmark run after the correctness pass
+BENCHMARK_ENABLED = os.getenv("BENCHMARK_ENABLED", "true").lower() == "true"
+BENCHMARK_WARMUP_REQUESTS = int(os.getenv("BENCHMARK_WARMUP_REQUESTS", "3"))
+BENCHMARK_SINGLE_REQUESTS = int(os.getenv("BENCHMARK_SINGLE_REQUESTS", "20"))
+BENCHMARK_BATCH_REQUESTS = int(os.getenv("BENCHMARK_BATCH_REQUESTS", "10"))
+BENCHMARK_BATCH_SIZE = int(os.getenv("BENCHMARK_BATCH_SIZE", "10"))
+BENCHMARK_CONCURRENCY = int(os.getenv("BENCHMARK_CONCURRENCY", "2"))
+BENCHMARK_TIMEOUT = int(os.getenv("BENCHMARK_TIMEOUT", "10"))
+# Plagiarism checks; LSH trades a small chance of missing a pair for sub-linear candidate search
+PLAGIARISM_SIMILARITY_THRESHOLD = float(os.getenv("PLAGIARISM_SIMILARITY_THRESHOLD", "0.95"))
+PLAGIARISM_LSH_ENABLED = os.getenv("PLAGIARISM_LSH_ENABLED", "false").lower() == "true"
+PLAGIARISM_LSH_BANDS = int(os.getenv("PLAGIARISM_LSH_BANDS", "64"))
+PLAGIARISM_LSH_BAND_BITS = int(os.getenv("PLAGIARISM_LSH_BAND_BITS", "32"))
+# Team endpoints must accept Content-Encoding: gzip request bodies when enabled
+EVALUATION_GZIP_PAYLOAD = os.getenv("EVALUATION_GZIP_PAYLOAD", "false").lower() == "true"
 MAX_RETRIES = 2
-QUEUE_CHECK_INTERVAL = 5
+# Team responses are streamed and parsed incrementally; a body larger than this (after decompression) fails the request
+EVALUATION_MAX_RESPONSE_BYTES = int(os.getenv("EVALUATION_MAX_RESPONSE_BYTES", str(2 * 1024 * 1024)))
+# The worker is woken on every submission; polling is only a safety net
+QUEUE_FALLBACK_POLL_INTERVAL = int(os.getenv("QUEUE_FALLBACK_POLL_INTERVAL", "60"))
 MAX_CONCURRENT_EVALUATIONS = int(os.getenv("MAX_CONCURRENT_EVALUATIONS", "5"))
+# A claimed queue entry is owned by one worker until its lease expires, after which it is re-queued
+EVALUATION_LEASE_SECONDS = int(os.getenv("EVALUATION_LEASE_SECONDS", "600"))
+WORKER_ID = os.getenv("WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+# A running evaluation extends its lease this often, so slow endpoints are not re-queued mid-evaluation
+EVALUATION_LEASE_RENEW_INTERVAL = int(os.getenv("EVALUATION_LEASE_RENEW_INTERVAL", str(max(1, EVALUATION_LEASE_SECONDS // 3))))
+# Blocking storage calls run on this many threads so the event loop never waits on Firestore
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "16"))
+# Evaluations finishing within the window are written in one commit (Firestore allows 500 writes:
+# 5 per evaluation plus the leaderboard document, so at most 99 evaluations)
+COMMIT_GROUP_WINDOW_MS = int(os.getenv("COMMIT_GROUP_WINDOW_MS", "25"))
+COMMIT_GROUP_MAX_SIZE = min(99, int(os.getenv("COMMIT_GROUP_MAX_SIZE", "50")))
+# Queue tickets come from a counter document; shards spread enqueue bursts over several counters
+QUEUE_SEQUENCE_SHARDS = max(1, int(os.getenv("QUEUE_SEQUENCE_SHARDS", "1")))
+
+# Shared outbound HTTP client used for all team endpoint calls
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "false").lower() == "true"
+
+# Response caching for polled read endpoints. Local writes invalidate immediately; writes made by
+# other processes are picked up after HTTP_CACHE_REVALIDATE_SECONDS at the latest
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "2"))
+HTTP_CACHE_REVALIDATE_SECONDS = float(os.getenv("HTTP_CACHE_REVALIDATE_SECONDS", "15"))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "1024"))
+
+# Rank lookups use an in-memory index refreshed from storage at most this often
+RANK_INDEX_MAX_AGE = float(os.getenv("RANK_INDEX_MAX_AGE", "30"))
+# Without a storage change listener (SQLite), the prediction index re-reads every submission at most this often
+PREDICTION_INDEX_MAX_AGE = float(os.getenv("PREDICTION_INDEX_MAX_AGE", "30"))
+
+# /leaderboard pages; requests without limit, cursor or top_k still get the full list
+LEADERBOARD_DEFAULT_PAGE_SIZE = int(os.getenv("LEADERBOARD_DEFAULT_PAGE_SIZE", "50"))
+LEADERBOARD_MAX_PAGE_SIZE = int(os.getenv("LEADERBOARD_MAX_PAGE_SIZE", "200"))
+
+# /events pushes queue and leaderboard changes; bursts of writes within the debounce window become one update
+LIVE_UPDATES_DEBOUNCE_MS = int(os.getenv("LIVE_UPDATES_DEBOUNCE_MS", "100"))
+# Re-read on this interval while anyone is subscribed, to pick up writes made by other processes
+LIVE_UPDATES_REFRESH_SECONDS = float(os.getenv("LIVE_UPDATES_REFRESH_SECONDS", "15"))
+LIVE_UPDATES_HEARTBEAT_SECONDS = float(os.getenv("LIVE_UPDATES_HEARTBEAT_SECONDS", "15"))
+LIVE_UPDATES_QUEUE_SIZE = int(os.getenv("LIVE_UPDATES_QUEUE_SIZE", "100"))
 
 API_HOST = "0.0.0.0"
 API_PORT = 8000
@@ -16,6 +87,20 @@ API_PORT = 8000
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Verified Firebase ID tokens are cached until they expire
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+
+# Endpoint pre-validation posts a few real test rows and expects one prediction back per row.
+# "sync" validates inside /submit-endpoint; "queue" accepts the submission at once and the worker fails it fast
+ENDPOINT_VALIDATION_MODE = os.getenv("ENDPOINT_VALIDATION_MODE", "sync")
+ENDPOINT_VALIDATION_PROBE_SIZE = int(os.getenv("ENDPOINT_VALIDATION_PROBE_SIZE", "3"))
+ENDPOINT_VALIDATION_TIMEOUT = float(os.getenv("ENDPOINT_VALIDATION_TIMEOUT", "5"))
+# Outcomes are cached per URL; failures expire sooner so a fixed endpoint can be resubmitted quickly
+ENDPOINT_VALIDATION_CACHE_TTL = float(os.getenv("ENDPOINT_VALIDATION_CACHE_TTL", "60"))
+ENDPOINT_VALIDATION_FAILURE_TTL = float(os.getenv("ENDPOINT_VALIDATION_FAILURE_TTL", "10"))
+ENDPOINT_VALIDATION_CACHE_SIZE = int(os.getenv("ENDPOINT_VALIDATION_CACHE_SIZE", "1024"))
+# The probe answer is a handful of predictions, so it gets a much smaller body limit than evaluations
+ENDPOINT_VALIDATION_MAX_RESPONSE_BYTES = int(os.getenv("ENDPOINT_VALIDATION_MAX_RESPONSE_BYTES", "65536"))
 
 # CORS Configuration - Add your Vercel domain here
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "").split(",")
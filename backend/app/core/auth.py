@@ -1,11 +1,16 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, AUTH_TOKEN_CACHE_SIZE
 from firebase_admin import auth as firebase_auth
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -43,6 +48,33 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Verified ID token claims keyed by SHA-256 of the token, each dropped once the token's exp passes
+_token_cache: "OrderedDict[str, Tuple[float, TokenData]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def get_cached_token(token: str) -> Optional[TokenData]:
+    key = _token_key(token)
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is None:
+            return None
+        expires_at, token_data = cached
+        if expires_at <= time.time():
+            del _token_cache[key]
+            return None
+        _token_cache.move_to_end(key)
+        return token_data
+
+def cache_token(token: str, expires_at: float, token_data: TokenData):
+    with _token_cache_lock:
+        _token_cache[_token_key(token)] = (expires_at, token_data)
+        _token_cache.move_to_end(_token_key(token))
+        while len(_token_cache) > AUTH_TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,11 +83,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     )
     
     token = credentials.credentials
-    print(f"Received token: {token[:50]}..." if len(token) > 50 else f"Received token: {token}")
+    
+    # Repeat requests from the same session skip signature verification entirely
+    token_data = get_cached_token(token)
+    if token_data is not None:
+        return token_data
     
     try:
-        # Verify Firebase ID token
-        decoded_token = firebase_auth.verify_id_token(token)
+        # Verify Firebase ID token off the event loop; firebase_admin fetches and caches its signing certificates
+        decoded_token = await asyncio.to_thread(firebase_auth.verify_id_token, token)
         uid = decoded_token.get('uid')
         email = decoded_token.get('email')
         
@@ -66,6 +102,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             raise credentials_exception
             
         token_data = TokenData(email=email, uid=uid)
+        cache_token(token, float(decoded_token['exp']), token_data)
         return token_data
     except Exception as e:
         error_name = type(e).__name__
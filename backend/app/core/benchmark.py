@@ -0,0 +1,93 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from app.config import (
+    BENCHMARK_WARMUP_REQUESTS,
+    BENCHMARK_SINGLE_REQUESTS,
+    BENCHMARK_BATCH_REQUESTS,
+    BENCHMARK_BATCH_SIZE,
+    BENCHMARK_CONCURRENCY,
+    BENCHMARK_TIMEOUT
+)
+from app.core.evaluator import encode_inputs, latency_percentiles
+from app.utils.http_client import call_team_endpoint, warmup_connection
+from app.data.test_data import TEST_DATA
+
+class LatencyBenchmark:
+    def __init__(
+        self,
+        warmup_requests: int = BENCHMARK_WARMUP_REQUESTS,
+        single_requests: int = BENCHMARK_SINGLE_REQUESTS,
+        batch_requests: int = BENCHMARK_BATCH_REQUESTS,
+        batch_size: int = BENCHMARK_BATCH_SIZE,
+        concurrency: int = BENCHMARK_CONCURRENCY,
+        timeout: int = BENCHMARK_TIMEOUT
+    ):
+        self.warmup_requests = warmup_requests
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.batch_size = batch_size
+        
+        # Records are cycled so small test sets still yield the configured request counts
+        self.single_payloads = [
+            encode_inputs([TEST_DATA[i % len(TEST_DATA)]])
+            for i in range(single_requests)
+        ]
+        self.batch_payloads = [
+            encode_inputs([TEST_DATA[(i * batch_size + j) % len(TEST_DATA)] for j in range(batch_size)])
+            for i in range(batch_requests)
+        ]
+    
+    async def send(self, endpoint_url: str, payload: bytes, expected: int) -> Optional[float]:
+        response = await call_team_endpoint(
+            endpoint_url,
+            payload,
+            timeout=self.timeout,
+            max_retries=0,
+            expected_predictions=expected
+        )
+        if response is None or 'predictions' not in response:
+            return None
+        return response['latency_ms']
+    
+    async def timed_requests(self, endpoint_url: str, payloads: List[bytes], expected: int) -> Tuple[List[float], int, float]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def timed(payload: bytes):
+            async with semaphore:
+                return await self.send(endpoint_url, payload, expected)
+        
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(timed(payload) for payload in payloads))
+        elapsed = time.perf_counter() - start_time
+        
+        latencies = [latency for latency in results if latency is not None]
+        return latencies, len(results) - len(latencies), elapsed
+    
+    async def run(self, endpoint_url: str) -> Optional[Dict]:
+        if not self.single_payloads:
+            return None
+        
+        await warmup_connection(endpoint_url, timeout=self.timeout)
+        
+        # Warmup requests absorb cold starts and are not timed
+        for i in range(self.warmup_requests):
+            await self.send(endpoint_url, self.single_payloads[i % len(self.single_payloads)], 1)
+        
+        single_latencies, single_failures, single_elapsed = await self.timed_requests(endpoint_url, self.single_payloads, 1)
+        if not single_latencies:
+            return None
+        
+        batch_latencies, batch_failures, _ = await self.timed_requests(endpoint_url, self.batch_payloads, self.batch_size)
+        
+        stats = {
+            **latency_percentiles(single_latencies, prefix='latency'),
+            **latency_percentiles(batch_latencies, prefix='batch_latency'),
+            'requests_per_second': len(single_latencies) / single_elapsed if single_elapsed > 0 else 0.0,
+            'benchmark_requests': len(single_latencies) + len(batch_latencies),
+            'benchmark_failures': single_failures + batch_failures
+        }
+        
+        print(f"Benchmark complete - p50: {stats['latency_p50_ms']:.2f}ms, p95: {stats['latency_p95_ms']:.2f}ms, p99: {stats['latency_p99_ms']:.2f}ms, {stats['requests_per_second']:.1f} req/s")
+        
+        return stats
@@ -1,71 +1,207 @@
+import asyncio
+import gzip
+import json
+import time
 import pandas as pd
 import numpy as np
-from sklearn.metrics import accuracy_score, f1_score
-from typing import Dict, Optional, Tuple
-from app.config import EVALUATION_TIMEOUT, MAX_RETRIES
-from app.utils.http_client import call_team_endpoint
+from typing import Dict, List, Optional, Tuple
+from app.config import (
+    EVALUATION_TIMEOUT,
+    MAX_RETRIES,
+    EVALUATION_GZIP_PAYLOAD,
+    EVALUATION_MODE,
+    EVALUATION_BATCH_SIZE,
+    EVALUATION_BATCH_CONCURRENCY
+)
+from app.core.scoring import as_binary_labels, score_predictions
+from app.utils.http_client import call_team_endpoint, warmup_connection
+from app.utils.metrics import track_stage
+from app.utils.timing import PhaseTimer
 from app.data.test_data import TEST_DATA, GROUND_TRUTH
 
+def encode_inputs(records: List[Dict]) -> bytes:
+    return json.dumps({"inputs": records}, separators=(',', ':')).encode('utf-8')
+
+def latency_percentiles(latencies: List[float], prefix: str = 'latency') -> Dict[str, float]:
+    if not latencies:
+        return {}
+    p50, p95, p99 = np.percentile(np.asarray(latencies, dtype=float), [50, 95, 99])
+    return {
+        f'{prefix}_p50_ms': float(p50),
+        f'{prefix}_p95_ms': float(p95),
+        f'{prefix}_p99_ms': float(p99)
+    }
+
 class Evaluator:
-    def __init__(self):
+    def __init__(self, mode: str = EVALUATION_MODE, batch_size: int = EVALUATION_BATCH_SIZE, batch_concurrency: int = EVALUATION_BATCH_CONCURRENCY):
         self.X_test = None
         self.y_true = None
+        self.mode = mode
+        self.batch_size = batch_size
+        self.batch_concurrency = batch_concurrency
+        self.payload_bytes: Optional[bytes] = None
+        self.payload_gzip: Optional[bytes] = None
+        self.batch_payloads: List[bytes] = []
+        self.batch_bounds: List[Tuple[int, int]] = []
         self.load_test_data()
     
     def load_test_data(self):
         print(f"Loading test data: {len(TEST_DATA)} samples")
         self.X_test = pd.DataFrame(TEST_DATA)
         self.y_true = np.array(GROUND_TRUTH)
+        self.build_payload()
         print(f"Test data loaded - Features: {self.X_test.shape[1]}, Samples: {len(self.y_true)}")
         print(f"Class distribution - Legitimate: {sum(self.y_true == 0)}, Fraud: {sum(self.y_true == 1)}")
     
-    async def evaluate_team(self, endpoint_url: str) -> Tuple[bool, Optional[Dict], Optional[str], Optional[list]]:
-        if self.X_test is None or self.y_true is None:
-            return False, None, "Test data not loaded", None
+    def build_payload(self):
+        # Called only when the dataset is loaded; every evaluation sends these exact bytes
+        records = self.X_test.to_dict(orient='records')
+        payload_bytes = encode_inputs(records)
         
-        payload = {
-            "inputs": self.X_test.to_dict(orient='records')
-        }
+        self.payload_bytes = payload_bytes
+        self.payload_gzip = gzip.compress(payload_bytes, mtime=0) if EVALUATION_GZIP_PAYLOAD else None
         
+        self.batch_bounds = [
+            (start, min(start + self.batch_size, len(records)))
+            for start in range(0, len(records), self.batch_size)
+        ]
+        self.batch_payloads = [encode_inputs(records[start:end]) for start, end in self.batch_bounds]
+        if EVALUATION_GZIP_PAYLOAD:
+            self.batch_payloads = [gzip.compress(batch, mtime=0) for batch in self.batch_payloads]
+        
+        print(f"Evaluation payload encoded - {len(payload_bytes)} bytes, {len(self.batch_bounds)} batches" + (f", {len(self.payload_gzip)} gzipped" if self.payload_gzip else ""))
+    
+    def request_body(self) -> Tuple[bytes, Dict[str, str]]:
+        if self.payload_gzip is not None:
+            return self.payload_gzip, {'Content-Encoding': 'gzip'}
+        return self.payload_bytes, {}
+    
+    def request_headers(self) -> Dict[str, str]:
+        return {'Content-Encoding': 'gzip'} if EVALUATION_GZIP_PAYLOAD else {}
+    
+    def record_network(self, timer: PhaseTimer, start: float, responses: List[Optional[Dict]]):
+        # JSON parsing happens inside the endpoint call
+        parse_ms = sum(response.get('parse_ms', 0) for response in responses if response)
+        end = time.perf_counter()
+        if len(responses) == 1:
+            # One request: parsing ran after the network wait, so it is split out of the span
+            timer.record('network', start, end - parse_ms / 1000)
+            timer.add('parse', parse_ms, start=end - parse_ms / 1000)
+        else:
+            # Concurrent batches parse while others are still in flight: the network span is wall-clock
+            # and parse is the summed parsing time of every batch, overlapping it
+            timer.record('network', start, end)
+            timer.add('parse', parse_ms, start=start)
+    
+    async def fetch_predictions_single(self, endpoint_url: str, timer: Optional[PhaseTimer] = None) -> Tuple[Optional[np.ndarray], List[float], Optional[str]]:
+        timer = timer or PhaseTimer()
+        with timer.phase('payload'):
+            body, headers = self.request_body()
+        
+        start = time.perf_counter()
+        await warmup_connection(endpoint_url)
         response = await call_team_endpoint(
-            endpoint_url, 
-            payload, 
-            timeout=EVALUATION_TIMEOUT, 
-            max_retries=MAX_RETRIES
+            endpoint_url,
+            body,
+            timeout=EVALUATION_TIMEOUT,
+            max_retries=MAX_RETRIES,
+            headers=headers,
+            expected_predictions=len(self.y_true)
         )
+        self.record_network(timer, start, [response])
         
         if response is None:
-            return False, None, "Failed to get response from endpoint", None
+            return None, [], "Failed to get response from endpoint"
+        
+        if 'error' in response:
+            return None, [], response['error']
+        
+        return response['predictions'], [float(response.get('latency_ms', 0))], None
+    
+    async def fetch_predictions_chunked(self, endpoint_url: str, timer: Optional[PhaseTimer] = None) -> Tuple[Optional[np.ndarray], List[float], Optional[str]]:
+        timer = timer or PhaseTimer()
+        # Batch payloads were encoded in build_payload; there is no per-evaluation payload work to time
+        headers = self.request_headers()
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
         
-        if 'predictions' not in response:
-            return False, None, "Response missing 'predictions' field", None
+        start = time.perf_counter()
+        await warmup_connection(endpoint_url)
         
-        predictions = response['predictions']
+        async def send_batch(index: int):
+            start, end = self.batch_bounds[index]
+            async with semaphore:
+                return await call_team_endpoint(
+                    endpoint_url,
+                    self.batch_payloads[index],
+                    timeout=EVALUATION_TIMEOUT,
+                    max_retries=MAX_RETRIES,
+                    headers=headers,
+                    expected_predictions=end - start
+                )
         
-        if not isinstance(predictions, list):
-            return False, None, "Predictions must be a list", None
+        responses = await asyncio.gather(*(send_batch(i) for i in range(len(self.batch_payloads))))
+        self.record_network(timer, start, responses)
+        
+        predictions = []
+        latencies = []
+        for (start, end), response in zip(self.batch_bounds, responses):
+            if response is None:
+                return None, [], f"Failed to get response from endpoint for samples {start}-{end - 1}"
+            
+            if 'error' in response:
+                return None, [], f"{response['error']} for samples {start}-{end - 1}"
+            
+            batch_predictions = response['predictions']
+            if len(batch_predictions) != end - start:
+                return None, [], f"Expected {end - start} predictions for samples {start}-{end - 1}, got {len(batch_predictions)}"
+            
+            predictions.append(batch_predictions)
+            latencies.append(float(response.get('latency_ms', 0)))
+        
+        return np.concatenate(predictions), latencies, None
+    
+    async def evaluate_team(self, endpoint_url: str, mode: Optional[str] = None, timer: Optional[PhaseTimer] = None) -> Tuple[bool, Optional[Dict], Optional[str], Optional[list]]:
+        if self.X_test is None or self.y_true is None:
+            return False, None, "Test data not loaded", None
+        
+        timer = timer or PhaseTimer()
+        mode = mode or self.mode
+        if mode == "chunked":
+            predictions, latencies, error = await self.fetch_predictions_chunked(endpoint_url, timer)
+        else:
+            predictions, latencies, error = await self.fetch_predictions_single(endpoint_url, timer)
+        
+        if error:
+            return False, None, error, None
         
         if len(predictions) != len(self.y_true):
             return False, None, f"Expected {len(self.y_true)} predictions, got {len(predictions)}", None
         
         try:
-            y_pred = np.array(predictions)
+            with timer.phase('parse'):
+                y_pred = as_binary_labels(predictions)
             
-            accuracy = accuracy_score(self.y_true, y_pred)
-            f1 = f1_score(self.y_true, y_pred, average='binary')
-            latency_ms = response.get('latency_ms', 0)
+            with track_stage('scoring'), timer.phase('scoring'):
+                metrics = score_predictions(self.y_true, y_pred)
+            accuracy = metrics['accuracy']
+            f1 = metrics['f1_score']
+            
+            # With one request this is that request's latency; with batches it is the median batch
+            percentiles = latency_percentiles(latencies, prefix='request_latency')
+            latency_ms = percentiles.get('request_latency_p50_ms', 0.0)
             
             result = {
-                'accuracy': float(accuracy),
-                'f1_score': float(f1),
-                'latency_ms': float(latency_ms)
+                **metrics,
+                'latency_ms': float(latency_ms),
+                'batch_count': len(latencies),
+                **percentiles
             }
             
-            print(f"Evaluation complete - Accuracy: {accuracy:.4f}, F1: {f1:.4f}, Latency: {latency_ms:.2f}ms")
+            print(f"Evaluation complete - Accuracy: {accuracy:.4f}, F1: {f1:.4f}, Latency: {latency_ms:.2f}ms ({mode}, {len(latencies)} requests)")
             
             predictions_list = y_pred.tolist()
             
             return True, result, None, predictions_list
-            
+        
         except Exception as e:
             return False, None, f"Error calculating metrics: {str(e)}", None
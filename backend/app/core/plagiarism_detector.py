@@ -1,54 +1,271 @@
 import numpy as np
-from typing import List, Dict, Tuple, Optional
-from sklearn.metrics.pairwise import cosine_similarity
+from itertools import combinations
+from typing import List, Dict, Tuple, Optional, Set
 from datetime import datetime
+from app.config import (
+    PLAGIARISM_SIMILARITY_THRESHOLD,
+    PLAGIARISM_LSH_ENABLED,
+    PLAGIARISM_LSH_BANDS,
+    PLAGIARISM_LSH_BAND_BITS
+)
+
+# Combined score weights; exact-match ratio and Hamming similarity are the same quantity on binary labels
+EXACT_MATCH_WEIGHT = 0.5
+COSINE_WEIGHT = 0.3
+HAMMING_WEIGHT = 0.2
+
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def popcount(packed: np.ndarray) -> np.ndarray:
+    """Number of set bits along the last axis of a packbits array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(packed).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT_TABLE[packed].sum(axis=-1, dtype=np.int64)
+
+def pack_predictions(predictions) -> np.ndarray:
+    return np.packbits(np.asarray(predictions) != 0, axis=-1)
+
+def combined_similarity(length: int, ones_a, ones_b, overlap, mismatches) -> np.ndarray:
+    ones_a = np.asarray(ones_a, dtype=float)
+    ones_b = np.asarray(ones_b, dtype=float)
+    overlap = np.asarray(overlap, dtype=float)
+    
+    match_ratio = 1 - np.asarray(mismatches, dtype=float) / length
+    
+    # Cosine of two 0/1 vectors; zero vectors score 0 like sklearn's cosine_similarity
+    norms = np.sqrt(ones_a * ones_b)
+    cosine = np.divide(overlap, norms, out=np.zeros(np.broadcast_shapes(overlap.shape, norms.shape)), where=norms != 0)
+    
+    return (match_ratio * EXACT_MATCH_WEIGHT) + (cosine * COSINE_WEIGHT) + (match_ratio * HAMMING_WEIGHT)
+
+class BitSamplingLSH:
+    """
+    Bit-sampling LSH for Hamming similarity over packed prediction rows.
+    Each band samples band_bits fixed positions; rows agreeing on every sampled bit of any band
+    share a bucket. A pair with match ratio s becomes a candidate with probability
+    1 - (1 - s ** band_bits) ** bands.
+    """
+    
+    def __init__(self, length: int, bands: int = PLAGIARISM_LSH_BANDS, band_bits: int = PLAGIARISM_LSH_BAND_BITS, seed: int = 0):
+        positions = np.random.default_rng(seed).integers(0, length, size=(bands, band_bits))
+        self.byte_index = positions >> 3
+        self.bit_shift = (7 - (positions & 7)).astype(np.uint8)
+        self.tables: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self.keys: Dict[str, List[bytes]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def band_keys(self, packed_row: np.ndarray) -> List[bytes]:
+        bits = (packed_row[self.byte_index] >> self.bit_shift) & 1
+        return [band.tobytes() for band in np.packbits(bits, axis=1)]
+    
+    def add(self, item_id: str, packed_row: np.ndarray):
+        self.remove(item_id)
+        keys = self.band_keys(packed_row)
+        for table, key in zip(self.tables, keys):
+            table.setdefault(key, set()).add(item_id)
+        self.keys[item_id] = keys
+    
+    def remove(self, item_id: str):
+        keys = self.keys.pop(item_id, None)
+        if keys is None:
+            return
+        for table, key in zip(self.tables, keys):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del table[key]
+    
+    def candidates(self, packed_row: np.ndarray) -> Set[str]:
+        found = set()
+        for table, key in zip(self.tables, self.band_keys(packed_row)):
+            found.update(table.get(key, ()))
+        return found
+    
+    def candidate_pairs(self) -> Set[Tuple[str, str]]:
+        pairs = set()
+        for table in self.tables:
+            for bucket in table.values():
+                if len(bucket) > 1:
+                    pairs.update(combinations(sorted(bucket), 2))
+        return pairs
 
 class PlagiarismDetector:
-    def __init__(self, similarity_threshold: float = 0.95):
+    def __init__(
+        self,
+        similarity_threshold: float = PLAGIARISM_SIMILARITY_THRESHOLD,
+        use_lsh: bool = PLAGIARISM_LSH_ENABLED,
+        lsh_bands: int = PLAGIARISM_LSH_BANDS,
+        lsh_band_bits: int = PLAGIARISM_LSH_BAND_BITS
+    ):
         self.similarity_threshold = similarity_threshold
+        self.use_lsh = use_lsh
+        self.lsh_bands = lsh_bands
+        self.lsh_band_bits = lsh_band_bits
     
-    def calculate_similarity(self, predictions1: List[int], predictions2: List[int]) -> float:
-        if len(predictions1) != len(predictions2):
-            return 0.0
+    def create_lsh(self, length: int) -> BitSamplingLSH:
+        return BitSamplingLSH(length, bands=self.lsh_bands, band_bits=self.lsh_band_bits)
+    
+    def similarity_to_packed(self, query: np.ndarray, length: int, packed: np.ndarray, ones: Optional[np.ndarray] = None) -> np.ndarray:
+        """Similarity of one packed prediction row against every row of a packed matrix of the same length."""
+        if packed.shape[0] == 0:
+            return np.zeros(0)
         
-        exact_match_ratio = sum(p1 == p2 for p1, p2 in zip(predictions1, predictions2)) / len(predictions1)
+        if ones is None:
+            ones = popcount(packed)
         
-        pred1_array = np.array(predictions1).reshape(1, -1)
-        pred2_array = np.array(predictions2).reshape(1, -1)
+        # Padding bits from packbits are zero in every row, so they never count as set or mismatched
+        mismatches = popcount(np.bitwise_xor(packed, query))
+        overlap = popcount(np.bitwise_and(packed, query))
         
-        cosine_sim = cosine_similarity(pred1_array, pred2_array)[0][0]
+        return combined_similarity(length, popcount(query), ones, overlap, mismatches)
+    
+    def calculate_similarity(self, predictions1: List[int], predictions2: List[int]) -> float:
+        if len(predictions1) != len(predictions2) or len(predictions1) == 0:
+            return 0.0
         
-        hamming_distance = sum(p1 != p2 for p1, p2 in zip(predictions1, predictions2))
-        hamming_similarity = 1 - (hamming_distance / len(predictions1))
+        packed2 = pack_predictions(predictions2)[None, :]
+        return float(self.similarity_to_packed(pack_predictions(predictions1), len(predictions1), packed2)[0])
+    
+    def cases_from_scores(self, team_ids: List[str], scores: np.ndarray) -> List[Dict[str, any]]:
+        detected_at = datetime.utcnow()
+        flagged = np.flatnonzero(scores >= self.similarity_threshold)
         
-        combined_similarity = (exact_match_ratio * 0.5) + (cosine_sim * 0.3) + (hamming_similarity * 0.2)
+        plagiarism_cases = [
+            {
+                'team_id': team_ids[i],
+                'similarity_score': float(scores[i]),
+                'detected_at': detected_at
+            }
+            for i in flagged
+        ]
+        plagiarism_cases.sort(key=lambda x: x['similarity_score'], reverse=True)
         
-        return float(combined_similarity)
+        return plagiarism_cases
+    
+    def detect_plagiarism_packed(
+        self,
+        team_id: str,
+        query: np.ndarray,
+        length: int,
+        team_ids: List[str],
+        packed: np.ndarray,
+        ones: Optional[np.ndarray] = None
+    ) -> List[Dict[str, any]]:
+        scores = self.similarity_to_packed(query, length, packed, ones)
+        if team_id in team_ids:
+            scores[team_ids.index(team_id)] = -1.0
+        return self.cases_from_scores(team_ids, scores)
     
     def detect_plagiarism(
-        self, 
-        team_id: str, 
-        predictions: List[int], 
+        self,
+        team_id: str,
+        predictions: List[int],
         all_team_predictions: Dict[str, List[int]]
     ) -> List[Dict[str, any]]:
-        plagiarism_cases = []
+        # Submissions of a different length cannot be compared and score 0, as before
+        other_ids = [
+            other_team_id for other_team_id, other_predictions in all_team_predictions.items()
+            if other_team_id != team_id and len(other_predictions) == len(predictions)
+        ]
+        if not other_ids or len(predictions) == 0:
+            return []
+        
+        query = pack_predictions(predictions)
+        packed = pack_predictions(np.array([all_team_predictions[other_id] for other_id in other_ids]))
+        
+        if self.use_lsh:
+            lsh = self.create_lsh(len(predictions))
+            for other_id, row in zip(other_ids, packed):
+                lsh.add(other_id, row)
+            candidates = lsh.candidates(query)
+            rows = [i for i, other_id in enumerate(other_ids) if other_id in candidates]
+            other_ids = [other_ids[i] for i in rows]
+            packed = packed[rows]
         
-        for other_team_id, other_predictions in all_team_predictions.items():
-            if other_team_id == team_id:
+        return self.detect_plagiarism_packed(team_id, query, len(predictions), other_ids, packed)
+    
+    def pairwise_similarity(self, all_team_predictions: Dict[str, List[int]]) -> Tuple[List[str], np.ndarray]:
+        """Similarity matrix for the whole field, computed from one Gram matrix per prediction length."""
+        team_ids = list(all_team_predictions.keys())
+        similarity = np.zeros((len(team_ids), len(team_ids)))
+        
+        by_length: Dict[int, List[int]] = {}
+        for i, team_id in enumerate(team_ids):
+            by_length.setdefault(len(all_team_predictions[team_id]), []).append(i)
+        
+        for length, indices in by_length.items():
+            if length == 0:
                 continue
             
-            similarity = self.calculate_similarity(predictions, other_predictions)
+            matrix = (np.array([all_team_predictions[team_ids[i]] for i in indices]) != 0).astype(np.float32)
+            overlap = matrix @ matrix.T
+            ones = np.diag(overlap)
+            mismatches = ones[:, None] + ones[None, :] - 2 * overlap
             
-            if similarity >= self.similarity_threshold:
-                plagiarism_cases.append({
-                    'team_id': other_team_id,
-                    'similarity_score': similarity,
-                    'detected_at': datetime.utcnow()
-                })
+            similarity[np.ix_(indices, indices)] = combined_similarity(length, ones[:, None], ones[None, :], overlap, mismatches)
         
-        plagiarism_cases.sort(key=lambda x: x['similarity_score'], reverse=True)
+        np.fill_diagonal(similarity, 0.0)
+        return team_ids, similarity
+    
+    def lsh_candidate_similarity(self, all_team_predictions: Dict[str, List[int]]) -> List[Tuple[str, str, float]]:
+        """Exact similarity for the LSH candidate pairs only, instead of the full N x N matrix."""
+        scored = []
         
-        return plagiarism_cases
+        by_length: Dict[int, List[str]] = {}
+        for team_id, predictions in all_team_predictions.items():
+            by_length.setdefault(len(predictions), []).append(team_id)
+        
+        for length, team_ids in by_length.items():
+            if length == 0 or len(team_ids) < 2:
+                continue
+            
+            packed = pack_predictions(np.array([all_team_predictions[team_id] for team_id in team_ids]))
+            rows = {team_id: i for i, team_id in enumerate(team_ids)}
+            
+            lsh = self.create_lsh(length)
+            for team_id, row in zip(team_ids, packed):
+                lsh.add(team_id, row)
+            
+            pairs = sorted(lsh.candidate_pairs())
+            if not pairs:
+                continue
+            
+            left = packed[[rows[a] for a, _ in pairs]]
+            right = packed[[rows[b] for _, b in pairs]]
+            scores = combined_similarity(
+                length,
+                popcount(left),
+                popcount(right),
+                popcount(np.bitwise_and(left, right)),
+                popcount(np.bitwise_xor(left, right))
+            )
+            scored.extend((a, b, float(score)) for (a, b), score in zip(pairs, scores))
+        
+        return scored
+    
+    def detect_all_pairs(self, all_team_predictions: Dict[str, List[int]]) -> List[Dict[str, any]]:
+        if self.use_lsh:
+            scored = self.lsh_candidate_similarity(all_team_predictions)
+        else:
+            team_ids, similarity = self.pairwise_similarity(all_team_predictions)
+            rows, cols = np.nonzero(np.triu(similarity >= self.similarity_threshold, k=1))
+            scored = [(team_ids[i], team_ids[j], float(similarity[i, j])) for i, j in zip(rows, cols)]
+        
+        pairs = [
+            {
+                'team_id': team_id,
+                'other_team_id': other_team_id,
+                'similarity_score': score
+            }
+            for team_id, other_team_id, score in scored
+            if score >= self.similarity_threshold
+        ]
+        pairs.sort(key=lambda x: x['similarity_score'], reverse=True)
+        
+        return pairs
     
     def is_plagiarized(self, plagiarism_cases: List[Dict]) -> bool:
         return len(plagiarism_cases) > 0
@@ -0,0 +1,187 @@
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from app.core.plagiarism_detector import BitSamplingLSH, PlagiarismDetector, pack_predictions, popcount
+from app.data.test_data import GROUND_TRUTH
+from app.db.storage import backend
+from app.config import PREDICTION_INDEX_MAX_AGE
+
+class PredictionIndex:
+    """
+    Resident bit-packed matrix of every team's stored predictions.
+    Loaded once, then updated in place on local saves and by the storage change listener where one exists,
+    so plagiarism checks never re-read the predictions collection. Without a listener it is reloaded
+    every PREDICTION_INDEX_MAX_AGE seconds to pick up submissions saved by other processes.
+    """
+    
+    def __init__(self, expected_length: int = len(GROUND_TRUTH)):
+        self.expected_length = expected_length
+        self.row_bytes = (expected_length + 7) // 8
+        self.lock = threading.Lock()
+        self.team_ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.packed = np.zeros((0, self.row_bytes), dtype=np.uint8)
+        self.ones = np.zeros(0, dtype=np.int64)
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.reload_lock = threading.Lock()
+        # Local saves since the last reload, which may not be committed when storage is read
+        self.local_upserts: Dict[str, np.ndarray] = {}
+        self.watch = None
+        self.lsh: Optional[BitSamplingLSH] = None
+    
+    def __len__(self) -> int:
+        return len(self.team_ids)
+    
+    def _grow(self):
+        capacity = max(16, 2 * self.packed.shape[0])
+        packed = np.zeros((capacity, self.row_bytes), dtype=np.uint8)
+        ones = np.zeros(capacity, dtype=np.int64)
+        packed[:len(self.team_ids)] = self.packed[:len(self.team_ids)]
+        ones[:len(self.team_ids)] = self.ones[:len(self.team_ids)]
+        self.packed = packed
+        self.ones = ones
+    
+    def _upsert(self, team_id: str, predictions) -> bool:
+        # Submissions for a different test set length can never match and are not indexed
+        if len(predictions) != self.expected_length:
+            self._remove(team_id)
+            return False
+        
+        row = self.rows.get(team_id)
+        if row is None:
+            if len(self.team_ids) == self.packed.shape[0]:
+                self._grow()
+            row = len(self.team_ids)
+            self.rows[team_id] = row
+            self.team_ids.append(team_id)
+        
+        self.packed[row] = pack_predictions(predictions)
+        self.ones[row] = popcount(self.packed[row])
+        if self.lsh is not None:
+            self.lsh.add(team_id, self.packed[row])
+        return True
+    
+    def _remove(self, team_id: str):
+        row = self.rows.pop(team_id, None)
+        if row is None:
+            return
+        
+        if self.lsh is not None:
+            self.lsh.remove(team_id)
+        
+        # Move the last row into the hole so the matrix stays dense
+        last = len(self.team_ids) - 1
+        if row != last:
+            moved_id = self.team_ids[last]
+            self.team_ids[row] = moved_id
+            self.rows[moved_id] = row
+            self.packed[row] = self.packed[last]
+            self.ones[row] = self.ones[last]
+        self.team_ids.pop()
+    
+    def load(self, all_predictions: Dict[str, np.ndarray]):
+        with self.lock:
+            self.team_ids = []
+            self.rows = {}
+            self.packed = np.zeros((0, self.row_bytes), dtype=np.uint8)
+            self.ones = np.zeros(0, dtype=np.int64)
+            self.lsh = None
+            for team_id, predictions in all_predictions.items():
+                self._upsert(team_id, predictions)
+            for team_id, predictions in self.local_upserts.items():
+                self._upsert(team_id, predictions)
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+    
+    def stale(self) -> bool:
+        return not self.loaded or (self.watch is None and time.monotonic() - self.loaded_at > PREDICTION_INDEX_MAX_AGE)
+    
+    def ensure_loaded(self):
+        if not self.stale():
+            return
+        with self.reload_lock:
+            if not self.stale():
+                return
+            with self.lock:
+                recent = self.local_upserts
+                self.local_upserts = {}
+            all_predictions = backend.get_all_predictions()
+            all_predictions.update(recent)
+            self.load(all_predictions)
+    
+    def upsert(self, team_id: str, predictions) -> bool:
+        with self.lock:
+            if self.watch is None:
+                self.local_upserts[team_id] = np.asarray(predictions)
+            return self._upsert(team_id, predictions)
+    
+    def remove(self, team_id: str):
+        with self.lock:
+            self._remove(team_id)
+    
+    def detect(self, detector: PlagiarismDetector, team_id: str, predictions) -> List[Dict[str, any]]:
+        self.ensure_loaded()
+        
+        if len(predictions) != self.expected_length:
+            return []
+        
+        query = pack_predictions(predictions)
+        
+        with self.lock:
+            if not detector.use_lsh:
+                size = len(self.team_ids)
+                return detector.detect_plagiarism_packed(
+                    team_id,
+                    query,
+                    self.expected_length,
+                    list(self.team_ids),
+                    self.packed[:size],
+                    self.ones[:size]
+                )
+            
+            if self.lsh is None:
+                self.lsh = detector.create_lsh(self.expected_length)
+                for row, indexed_id in enumerate(self.team_ids):
+                    self.lsh.add(indexed_id, self.packed[row])
+            
+            # Only rows sharing an LSH bucket with the query are verified exactly
+            candidate_ids = sorted(self.lsh.candidates(query))
+            rows = [self.rows[candidate_id] for candidate_id in candidate_ids]
+            return detector.detect_plagiarism_packed(
+                team_id,
+                query,
+                self.expected_length,
+                candidate_ids,
+                self.packed[rows],
+                self.ones[rows]
+            )
+    
+    def _on_change(self, changes: Dict[str, Optional[np.ndarray]]):
+        # Runs on the listener thread, once per snapshot; the first one delivers every stored team
+        with self.lock:
+            for team_id, predictions in changes.items():
+                if predictions is None:
+                    self._remove(team_id)
+                else:
+                    self._upsert(team_id, predictions)
+            self.loaded = True
+    
+    def start_sync(self):
+        if self.watch is not None:
+            return
+        self.watch = backend.watch_predictions(self._on_change)
+        if self.watch is None:
+            print(f"Prediction listener unavailable, reloading the index every {PREDICTION_INDEX_MAX_AGE:g}s")
+            self.ensure_loaded()
+    
+    def stop_sync(self):
+        if self.watch is not None:
+            try:
+                self.watch.unsubscribe()
+            except Exception as e:
+                print(f"Error stopping prediction listener: {e}")
+            self.watch = None
+
+prediction_index = PredictionIndex()
@@ -1,44 +1,92 @@
 import asyncio
-from app.db.firebase_service import (
-    get_next_in_queue, 
+import time
+from app.db.storage import (
+    run_in_storage_thread,
+    claim_next_in_queue,
+    requeue_expired_leases,
+    renew_lease,
     update_queue_status, 
     get_team_endpoint, 
-    save_result,
-    save_predictions,
-    get_all_predictions,
-    save_plagiarism_data
+    commit_evaluations
 )
+from app.db.group_commit import GroupCommitter
 from app.db.models import QueueStatus
+from app.db.records import REQUEST_STATS_FIELDS, SCORE_FIELDS
 from app.core.evaluator import Evaluator
+from app.core.benchmark import LatencyBenchmark
 from app.core.plagiarism_detector import PlagiarismDetector
-from app.config import MAX_CONCURRENT_EVALUATIONS
+from app.core.prediction_index import prediction_index
+from app.utils.timing import PhaseTimer
+from app.utils.validators import prevalidate_for_evaluation
+from app.utils.metrics import track_stage, active_evaluations, evaluation_duration, evaluations_total
+from app.config import MAX_CONCURRENT_EVALUATIONS, BENCHMARK_ENABLED, ENDPOINT_VALIDATION_MODE, EVALUATION_LEASE_RENEW_INTERVAL
 
 evaluator = Evaluator()
-plagiarism_detector = PlagiarismDetector(similarity_threshold=0.95)
+latency_benchmark = LatencyBenchmark()
+plagiarism_detector = PlagiarismDetector()
+evaluation_committer = GroupCommitter(commit_evaluations)
+
+async def keep_lease(team_id):
+    # Retries, the benchmark and waits for per-host slots can outlast one lease
+    while True:
+        await asyncio.sleep(EVALUATION_LEASE_RENEW_INTERVAL)
+        try:
+            if not await renew_lease(team_id):
+                print(f"Lease lost for team {team_id}; its outcome will not be written by this worker")
+                return
+        except Exception as e:
+            print(f"Error renewing lease for team {team_id}: {e}")
 
 async def process_single_team(team_id):
-    update_queue_status(team_id, QueueStatus.EVALUATING)
-    
-    endpoint_url = get_team_endpoint(team_id)
+    active_evaluations.inc()
+    start = time.perf_counter()
+    completed = False
+    lease = asyncio.create_task(keep_lease(team_id))
+    try:
+        completed = await run_evaluation(team_id)
+    finally:
+        lease.cancel()
+        active_evaluations.dec()
+        evaluation_duration.observe(time.perf_counter() - start)
+        evaluations_total.inc(outcome='completed' if completed else 'failed')
+
+async def run_evaluation(team_id) -> bool:
+    timer = PhaseTimer()
+    with timer.phase('endpoint_lookup'):
+        endpoint_url = await get_team_endpoint(team_id)
     
     if not endpoint_url:
-        update_queue_status(team_id, QueueStatus.FAILED, "Endpoint URL not found")
-        return
+        await update_queue_status(team_id, QueueStatus.FAILED, "Endpoint URL not found", timer.to_dict())
+        return False
     
     try:
-        success, result, error, predictions = await evaluator.evaluate_team(endpoint_url)
+        # In queue mode the submission was accepted unprobed; a wrong answer fails here before the full evaluation
+        if ENDPOINT_VALIDATION_MODE == "queue":
+            with timer.phase('validation'):
+                failure = await prevalidate_for_evaluation(endpoint_url)
+            if failure:
+                await update_queue_status(team_id, QueueStatus.FAILED, f"Invalid endpoint: {failure}", timer.to_dict())
+                return False
+        
+        success, result, error, predictions = await evaluator.evaluate_team(endpoint_url, timer=timer)
         
         if success and result and predictions:
-            save_result(team_id, result["accuracy"], result["f1_score"], result["latency_ms"])
-            
-            save_predictions(team_id, predictions)
+            benchmark = None
+            if BENCHMARK_ENABLED:
+                try:
+                    with timer.phase('benchmark'):
+                        benchmark = await latency_benchmark.run(endpoint_url)
+                except Exception as e:
+                    print(f"Latency benchmark failed for team {team_id}: {e}")
             
-            all_predictions = get_all_predictions()
-            plagiarism_cases = plagiarism_detector.detect_plagiarism(
-                team_id, 
-                predictions, 
-                all_predictions
-            )
+            # The index may load from storage on first use and detection scans every team, so both stay off the loop
+            with track_stage('plagiarism'):
+                # Only the first evaluation after startup reads every stored submission
+                with timer.phase('index_load'):
+                    await run_in_storage_thread(prediction_index.ensure_loaded)
+                # Detection skips the team's own row, so its new predictions are indexed only once they are stored
+                with timer.phase('plagiarism'):
+                    plagiarism_cases = await run_in_storage_thread(prediction_index.detect, plagiarism_detector, team_id, predictions)
             
             is_flagged = plagiarism_detector.is_plagiarized(plagiarism_cases)
             
@@ -50,30 +98,67 @@ async def process_single_team(team_id):
                 }
                 for case in plagiarism_cases
             ]
-            save_plagiarism_data(team_id, plagiarism_cases_serializable, is_flagged)
             
-            update_queue_status(team_id, QueueStatus.COMPLETED)
-        else:
-            update_queue_status(team_id, QueueStatus.FAILED, error or "Evaluation failed")
+            # Result, benchmark, predictions, plagiarism report and COMPLETED status land in one commit
+            with track_stage('storage_write'):
+                committed = await evaluation_committer.submit({
+                    'team_id': team_id,
+                    'accuracy': result["accuracy"],
+                    'f1_score': result["f1_score"],
+                    'latency_ms': result["latency_ms"],
+                    'benchmark': benchmark,
+                    'request_stats': {field: result.get(field) for field in REQUEST_STATS_FIELDS},
+                    'scores': {field: result.get(field) for field in SCORE_FIELDS},
+                    'predictions': predictions,
+                    'plagiarism_cases': plagiarism_cases_serializable,
+                    'is_flagged': is_flagged,
+                    # The commit's own duration cannot be part of what it writes; it is in /metrics as storage_write
+                    'phase_timings': timer.to_dict()
+                })
+            if not committed:
+                print(f"Lease for team {team_id} expired before its result was written; discarded")
+                return False
+            
+            await run_in_storage_thread(prediction_index.upsert, team_id, predictions)
+            return True
+        
+        await update_queue_status(team_id, QueueStatus.FAILED, error or "Evaluation failed", timer.to_dict())
+        return False
         
     except Exception as e:
-        update_queue_status(team_id, QueueStatus.FAILED, str(e))
+        await update_queue_status(team_id, QueueStatus.FAILED, str(e), timer.to_dict())
+        return False
 
-async def process_queue():
-    team_id = get_next_in_queue()
+async def process_queue(on_claimed=None) -> bool:
+    with track_stage('claim'):
+        team_id = await claim_next_in_queue()
     
     if not team_id:
-        return
+        return False
+    
+    if on_claimed:
+        on_claimed()
     
     await process_single_team(team_id)
+    return True
+
+async def recover_expired_leases():
+    requeued = await requeue_expired_leases()
+    for team_id in requeued:
+        print(f"Lease expired for team {team_id}, re-queued")
+    return requeued
 
 async def process_queue_parallel():
+    await recover_expired_leases()
+    
     tasks = []
     
     for _ in range(MAX_CONCURRENT_EVALUATIONS):
-        team_id = get_next_in_queue()
-        if team_id:
-            tasks.append(process_single_team(team_id))
+        with track_stage('claim'):
+            team_id = await claim_next_in_queue()
+        if not team_id:
+            break
+        tasks.append(process_single_team(team_id))
     
     if tasks:
         await asyncio.gather(*tasks, return_exceptions=True)
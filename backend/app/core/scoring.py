@@ -0,0 +1,66 @@
+import numpy as np
+from typing import Dict, Union
+
+def as_binary_labels(values) -> np.ndarray:
+    labels = np.asarray(values)
+    if labels.dtype == bool:
+        return labels.astype(np.int8)
+    if not np.isin(labels, (0, 1)).all():
+        raise ValueError("Predictions must be binary labels (0 or 1)")
+    return labels.astype(np.int8)
+
+def confusion_counts(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    """
+    Binary confusion matrix counts as [tn, fp, fn, tp] along the last axis.
+    y_pred may be one prediction vector or a (teams, samples) matrix scored in one bincount.
+    """
+    y_true = as_binary_labels(y_true)
+    y_pred = as_binary_labels(y_pred)
+    single = y_pred.ndim == 1
+    y_pred = np.atleast_2d(y_pred)
+    
+    if y_pred.shape[1] != y_true.shape[0]:
+        raise ValueError(f"Expected {y_true.shape[0]} predictions, got {y_pred.shape[1]}")
+    
+    # Each cell gets a code 0..3 (2 * truth + prediction), offset by 4 per row
+    codes = 2 * y_true.astype(np.int64) + y_pred + 4 * np.arange(y_pred.shape[0])[:, None]
+    counts = np.bincount(codes.ravel(), minlength=4 * y_pred.shape[0]).reshape(-1, 4)
+    
+    return counts[0] if single else counts
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Matches sklearn's zero_division=0 behaviour
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+def metrics_from_counts(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    counts = np.asarray(counts, dtype=float)
+    tn, fp, fn, tp = counts[..., 0], counts[..., 1], counts[..., 2], counts[..., 3]
+    total = tn + fp + fn + tp
+    
+    precision = _safe_divide(tp, tp + fp)
+    recall = _safe_divide(tp, tp + fn)
+    specificity = _safe_divide(tn, tn + fp)
+    mcc_denominator = np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))
+    # Like sklearn, balanced accuracy averages recall over the classes present in y_true only
+    classes_present = (tp + fn > 0).astype(float) + (tn + fp > 0)
+    balanced_accuracy = _safe_divide(recall * (tp + fn > 0) + specificity * (tn + fp > 0), classes_present)
+    
+    return {
+        'accuracy': _safe_divide(tp + tn, total),
+        'precision': precision,
+        'recall': recall,
+        'f1_score': _safe_divide(2 * tp, 2 * tp + fp + fn),
+        'mcc': _safe_divide(tp * tn - fp * fn, mcc_denominator),
+        'balanced_accuracy': balanced_accuracy
+    }
+
+def score_predictions(y_true, y_pred) -> Dict[str, Union[float, np.ndarray]]:
+    """Score one prediction vector (floats returned) or a (teams, samples) matrix (arrays returned)."""
+    counts = confusion_counts(y_true, y_pred)
+    metrics = metrics_from_counts(counts)
+    
+    if counts.ndim == 1:
+        return {name: float(value) for name, value in metrics.items()}
+    return metrics
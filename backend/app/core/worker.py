@@ -1,28 +1,118 @@
 import asyncio
-from app.core.queue_manager import process_queue_parallel
-from app.config import QUEUE_CHECK_INTERVAL
+from typing import List, Optional
+from app.core.queue_manager import process_queue, recover_expired_leases, evaluation_committer
+from app.core.prediction_index import prediction_index
+from app.db.storage import backend
+from app.config import MAX_CONCURRENT_EVALUATIONS, QUEUE_FALLBACK_POLL_INTERVAL
 
 worker_task = None
+slot_tasks = []
+# One event per slot: a slot clearing its own event cannot swallow a wakeup meant for another
+slot_events: List[asyncio.Event] = []
+worker_loop: Optional[asyncio.AbstractEventLoop] = None
+queue_watch = None
+
+def notify_worker():
+    """Wake idle worker slots. Safe to call from any thread, and a no-op when no worker runs."""
+    if worker_loop is None or not slot_events or worker_loop.is_closed():
+        return
+
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+
+    if running_loop is worker_loop:
+        wake_slots()
+    else:
+        worker_loop.call_soon_threadsafe(wake_slots)
+
+def wake_slots():
+    for event in slot_events:
+        event.set()
+
+def _on_queue_snapshot(docs, changes, read_time):
+    # Called from the Firestore watch thread for submissions made by other processes
+    if any(change.type.name in ("ADDED", "MODIFIED") for change in changes):
+        notify_worker()
 
 async def start_worker():
-    global worker_task
+    global worker_task, worker_loop, queue_watch
+    worker_loop = asyncio.get_running_loop()
+    slot_events[:] = [asyncio.Event() for _ in range(MAX_CONCURRENT_EVALUATIONS)]
+
+    queue_watch = backend.watch_queue(_on_queue_snapshot)
+    if queue_watch is None:
+        print("Queue listener unavailable, relying on polling")
+
+    prediction_index.start_sync()
+    
     worker_task = asyncio.create_task(run_worker())
     return worker_task
 
 async def run_worker():
+    slot_tasks.clear()
+    slot_tasks.append(asyncio.create_task(run_lease_reaper()))
+    for slot in range(MAX_CONCURRENT_EVALUATIONS):
+        slot_tasks.append(asyncio.create_task(run_slot(slot)))
+
+    try:
+        await asyncio.gather(*slot_tasks)
+    finally:
+        for task in slot_tasks:
+            task.cancel()
+
+async def run_slot(slot: int):
+    wakeup_event = slot_events[slot]
     while True:
+        # Clear before looking at the queue so a submission landing mid-check is not lost
+        wakeup_event.clear()
+
         try:
-            await process_queue_parallel()
+            processed = await process_queue(on_claimed=wake_slots)
         except Exception as e:
-            print(f"Error in background worker: {e}")
+            print(f"Error in background worker slot {slot}: {e}")
+            processed = False
+
+        if processed:
+            continue
+
+        try:
+            await asyncio.wait_for(wakeup_event.wait(), timeout=QUEUE_FALLBACK_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_lease_reaper():
+    # Re-queue entries whose worker died mid-evaluation
+    while True:
+        try:
+            if await recover_expired_leases():
+                notify_worker()
+        except Exception as e:
+            print(f"Error re-queueing expired leases: {e}")
         
-        await asyncio.sleep(QUEUE_CHECK_INTERVAL)
+        await asyncio.sleep(QUEUE_FALLBACK_POLL_INTERVAL)
 
 async def stop_worker():
-    global worker_task
+    global worker_task, queue_watch, worker_loop
+    if queue_watch is not None:
+        try:
+            queue_watch.unsubscribe()
+        except Exception as e:
+            print(f"Error stopping queue listener: {e}")
+        queue_watch = None
+    
+    prediction_index.stop_sync()
+
     if worker_task:
         worker_task.cancel()
         try:
             await worker_task
         except asyncio.CancelledError:
             pass
+        worker_task = None
+
+    # Finished evaluations still waiting for their group commit are written before shutdown
+    await evaluation_committer.flush()
+
+    worker_loop = None
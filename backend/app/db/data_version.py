@@ -0,0 +1,36 @@
+import threading
+from typing import Callable, Dict, List
+
+LEADERBOARD = "leaderboard"
+PLAGIARISM = "plagiarism"
+# Any queue change can move every waiting team's place in line, so the queue shares one scope
+QUEUE = "queue"
+
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+# Called with the bumped scopes, on whichever thread made the change
+_listeners: List[Callable] = []
+
+def queue_key(team_id: str) -> str:
+    return f"queue:{team_id}"
+
+def add_listener(callback: Callable):
+    _listeners.append(callback)
+
+def remove_listener(callback: Callable):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+def bump(*scopes: str):
+    with _lock:
+        for scope in scopes:
+            _versions[scope] = _versions.get(scope, 0) + 1
+    
+    for callback in list(_listeners):
+        try:
+            callback(scopes)
+        except Exception as e:
+            print(f"Error in data version listener: {e}")
+
+def current(scope: str) -> int:
+    return _versions.get(scope, 0)
@@ -1,224 +1,489 @@
 import sqlite3
 import os
+import json
+import queue
+import numpy as np
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional
-from app.db.models import QueueStatus, TeamInDB, QueueEntry, EvaluationResult, LeaderboardEntry
-from app.config import DATABASE_PATH, DATA_DIR
+from typing import Dict, List, Optional, Tuple
+from app.db import data_version
+from app.db.rank_index import RankIndex
+from app.db.models import QueueStatus, QueueEntry, LeaderboardEntry
+from app.db.prediction_codec import encode_predictions, decode_predictions
+from app.db.records import BENCHMARK_FIELDS, REQUEST_STATS_FIELDS, SCORE_FIELDS, plagiarism_summary_fields, leaderboard_entries_to_models
+from app.config import (
+    DATABASE_PATH,
+    SQLITE_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    EVALUATION_LEASE_SECONDS,
+    WORKER_ID,
+    RANK_INDEX_MAX_AGE
+)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS teams (
+        team_id TEXT PRIMARY KEY,
+        team_name TEXT NOT NULL,
+        endpoint_url TEXT NOT NULL,
+        user_id TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS queue (
+        team_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        position INTEGER,
+        queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        failure_reason TEXT,
+        lease_owner TEXT,
+        lease_expires_at TIMESTAMP,
+        FOREIGN KEY (team_id) REFERENCES teams(team_id)
+    )
+    """,
+    # Claims and place-in-line counts both filter on status and order by position
+    "CREATE INDEX IF NOT EXISTS idx_queue_status_position ON queue (status, position)",
+    """
+    CREATE TABLE IF NOT EXISTS sequences (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO sequences (name, value) VALUES ('queue', 0)",
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        team_id TEXT PRIMARY KEY,
+        accuracy REAL NOT NULL,
+        f1_score REAL NOT NULL,
+        latency_ms REAL NOT NULL,
+        latency_p50_ms REAL,
+        latency_p95_ms REAL,
+        latency_p99_ms REAL,
+        batch_latency_p50_ms REAL,
+        batch_latency_p95_ms REAL,
+        batch_latency_p99_ms REAL,
+        requests_per_second REAL,
+        benchmark_requests INTEGER,
+        benchmark_failures INTEGER,
+        request_latency_p50_ms REAL,
+        request_latency_p95_ms REAL,
+        request_latency_p99_ms REAL,
+        batch_count INTEGER,
+        precision REAL,
+        recall REAL,
+        mcc REAL,
+        balanced_accuracy REAL,
+        evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (team_id) REFERENCES teams(team_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS predictions (
+        team_id TEXT PRIMARY KEY,
+        predictions BLOB NOT NULL,
+        saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS evaluation_timings (
+        team_id TEXT PRIMARY KEY,
+        outcome TEXT NOT NULL,
+        phase_timings TEXT NOT NULL,
+        recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS plagiarism (
+        team_id TEXT PRIMARY KEY,
+        is_flagged INTEGER NOT NULL DEFAULT 0,
+        plagiarism_cases TEXT NOT NULL DEFAULT '[]',
+        checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+]
+
+class ConnectionPool:
+    """
+    Fixed set of long-lived connections shared by the storage threads. Each connection keeps
+    its own cache of prepared statements, so the constant SQL below is compiled once per connection.
+    """
+    
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.connections = queue.Queue()
+        for _ in range(max(1, size)):
+            self.connections.put(self._connect())
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; writes open their own BEGIN IMMEDIATE transaction
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+    
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
+pool: Optional[ConnectionPool] = None
 
 def init_db():
-    os.makedirs(DATA_DIR, exist_ok=True)
-    
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS teams (
-            team_id TEXT PRIMARY KEY,
-            team_name TEXT NOT NULL,
-            endpoint_url TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS queue (
-            team_id TEXT PRIMARY KEY,
-            status TEXT NOT NULL,
-            position INTEGER,
-            queued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            failure_reason TEXT,
-            FOREIGN KEY (team_id) REFERENCES teams(team_id)
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS results (
-            team_id TEXT PRIMARY KEY,
-            accuracy REAL NOT NULL,
-            f1_score REAL NOT NULL,
-            latency_ms REAL NOT NULL,
-            evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (team_id) REFERENCES teams(team_id)
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    global pool
+    if pool is not None:
+        return pool
+    
+    directory = os.path.dirname(DATABASE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    pool = ConnectionPool(DATABASE_PATH, SQLITE_POOL_SIZE)
+    with transaction() as conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+    return pool
 
-def get_connection():
-    return sqlite3.connect(DATABASE_PATH)
+def get_pool() -> ConnectionPool:
+    return pool or init_db()
 
-def add_team(team_id: str, team_name: str, endpoint_url: str) -> bool:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute(
-            "INSERT INTO teams (team_id, team_name, endpoint_url) VALUES (?, ?, ?)",
-            (team_id, team_name, endpoint_url)
-        )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        cursor.execute(
-            "UPDATE teams SET team_name = ?, endpoint_url = ? WHERE team_id = ?",
-            (team_name, endpoint_url, team_id)
+@contextmanager
+def connection():
+    with get_pool().connection() as conn:
+        yield conn
+
+@contextmanager
+def transaction():
+    # IMMEDIATE takes the write lock up front, so concurrent writers wait on busy_timeout instead of failing on upgrade
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+def _timestamp(value) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def add_team(team_id: str, team_name: str, endpoint_url: str, user_id: str) -> bool:
+    with transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO teams (team_id, team_name, endpoint_url, user_id) VALUES (?, ?, ?, ?)
+            ON CONFLICT(team_id) DO UPDATE SET
+                team_name = excluded.team_name, endpoint_url = excluded.endpoint_url, user_id = excluded.user_id
+            """,
+            (team_id, team_name, endpoint_url, user_id)
         )
-        conn.commit()
-        return True
-    finally:
-        conn.close()
+    return True
+
+def _place_in_line(conn, ticket: int) -> int:
+    row = conn.execute(
+        "SELECT COUNT(*) FROM queue WHERE status = ? AND position < ?",
+        (QueueStatus.QUEUED.value, ticket)
+    ).fetchone()
+    return row[0] + 1
 
 def add_to_queue(team_id: str) -> int:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT MAX(position) FROM queue WHERE status = ?", (QueueStatus.QUEUED.value,))
-    max_pos = cursor.fetchone()[0]
-    position = (max_pos or 0) + 1
-    
-    try:
-        cursor.execute(
-            "INSERT INTO queue (team_id, status, position) VALUES (?, ?, ?)",
-            (team_id, QueueStatus.QUEUED.value, position)
-        )
-    except sqlite3.IntegrityError:
-        cursor.execute(
-            "UPDATE queue SET status = ?, position = ?, queued_at = CURRENT_TIMESTAMP, failure_reason = NULL WHERE team_id = ?",
-            (QueueStatus.QUEUED.value, position, team_id)
+    with transaction() as conn:
+        # The ticket comes from a sequence row bumped in the same transaction as the insert
+        ticket = conn.execute("UPDATE sequences SET value = value + 1 WHERE name = 'queue' RETURNING value").fetchall()[0][0]
+        conn.execute(
+            """
+            INSERT INTO queue (team_id, status, position) VALUES (?, ?, ?)
+            ON CONFLICT(team_id) DO UPDATE SET
+                status = excluded.status, position = excluded.position, queued_at = CURRENT_TIMESTAMP,
+                failure_reason = NULL, lease_owner = NULL, lease_expires_at = NULL
+            """,
+            (team_id, QueueStatus.QUEUED.value, ticket)
         )
+        position = _place_in_line(conn, ticket)
     
-    conn.commit()
-    conn.close()
+    data_version.bump(data_version.QUEUE)
     return position
 
 def get_queue_status(team_id: str) -> Optional[QueueEntry]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT team_id, status, position, queued_at, failure_reason FROM queue WHERE team_id = ?",
-        (team_id,)
-    )
-    row = cursor.fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT team_id, status, position, queued_at, failure_reason FROM queue WHERE team_id = ?",
+            (team_id,)
+        ).fetchone()
+        
+        # The stored position is an enqueue ticket; only waiting entries have a place in line
+        position = None
+        if row and row[1] == QueueStatus.QUEUED.value and row[2] is not None:
+            position = _place_in_line(conn, row[2])
     
     if row:
         return QueueEntry(
             team_id=row[0],
             status=QueueStatus(row[1]),
-            position=row[2],
-            queued_at=datetime.fromisoformat(row[3]),
+            position=position,
+            queued_at=_timestamp(row[3]),
             failure_reason=row[4]
         )
     return None
 
-def get_next_in_queue() -> Optional[str]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT COUNT(*) FROM queue WHERE status = ?",
-        (QueueStatus.EVALUATING.value,)
+def get_active_queue() -> Tuple[List[str], List[str]]:
+    """Team ids waiting (in queue order) and being evaluated."""
+    with connection() as conn:
+        queued = conn.execute(
+            "SELECT team_id FROM queue WHERE status = ? ORDER BY position ASC",
+            (QueueStatus.QUEUED.value,)
+        ).fetchall()
+        evaluating = conn.execute("SELECT team_id FROM queue WHERE status = ?", (QueueStatus.EVALUATING.value,)).fetchall()
+    return [row[0] for row in queued], [row[0] for row in evaluating]
+
+def get_queue_length() -> int:
+    with connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM queue WHERE status = ?", (QueueStatus.QUEUED.value,)).fetchone()[0]
+
+def claim_next_in_queue(worker_id: str = WORKER_ID, lease_seconds: int = EVALUATION_LEASE_SECONDS) -> Optional[str]:
+    with transaction() as conn:
+        # Single statement, so two workers can never claim the same entry
+        rows = conn.execute(
+            """
+            UPDATE queue
+            SET status = ?, lease_owner = ?, lease_expires_at = datetime('now', ?), failure_reason = NULL
+            WHERE team_id = (
+                SELECT team_id FROM queue WHERE status = ? ORDER BY position ASC LIMIT 1
+            )
+            RETURNING team_id
+            """,
+            (QueueStatus.EVALUATING.value, worker_id, f"+{lease_seconds} seconds", QueueStatus.QUEUED.value)
+        ).fetchall()
+    
+    if rows:
+        data_version.bump(data_version.QUEUE)
+    return rows[0][0] if rows else None
+
+def requeue_expired_leases() -> List[str]:
+    with transaction() as conn:
+        rows = conn.execute(
+            """
+            UPDATE queue
+            SET status = ?, lease_owner = NULL, lease_expires_at = NULL
+            WHERE status = ? AND (lease_expires_at IS NULL OR lease_expires_at <= datetime('now'))
+            RETURNING team_id
+            """,
+            (QueueStatus.QUEUED.value, QueueStatus.EVALUATING.value)
+        ).fetchall()
+    
+    requeued = [row[0] for row in rows]
+    if requeued:
+        data_version.bump(data_version.QUEUE)
+    return requeued
+
+def watch_queue(callback):
+    # No change listeners: submissions in this process wake the worker directly, other processes are picked up by polling
+    return None
+
+def renew_lease(team_id: str, worker_id: str = WORKER_ID, lease_seconds: int = EVALUATION_LEASE_SECONDS) -> bool:
+    """Extend a lease this worker still holds; False once it has expired and been re-queued or re-claimed."""
+    with transaction() as conn:
+        cursor = conn.execute(
+            "UPDATE queue SET lease_expires_at = datetime('now', ?) WHERE team_id = ? AND status = ? AND lease_owner = ?",
+            (f"+{lease_seconds} seconds", team_id, QueueStatus.EVALUATING.value, worker_id)
+        )
+    return cursor.rowcount > 0
+
+def _release_lease(conn, team_id: str, status: QueueStatus, failure_reason: Optional[str], worker_id: str) -> bool:
+    # Only the lease holder finishes an entry; a worker whose lease expired must not overwrite the new owner's outcome
+    cursor = conn.execute(
+        """
+        UPDATE queue SET status = ?, failure_reason = ?, lease_owner = NULL, lease_expires_at = NULL
+        WHERE team_id = ? AND status = ? AND lease_owner = ?
+        """,
+        (status.value, failure_reason, team_id, QueueStatus.EVALUATING.value, worker_id)
     )
-    if cursor.fetchone()[0] > 0:
-        conn.close()
-        return None
-    
-    cursor.execute(
-        "SELECT team_id FROM queue WHERE status = ? ORDER BY position ASC LIMIT 1",
-        (QueueStatus.QUEUED.value,)
+    return cursor.rowcount > 0
+
+def update_queue_status(team_id: str, status: QueueStatus, failure_reason: Optional[str] = None, phase_timings: Optional[Dict] = None, worker_id: str = WORKER_ID) -> bool:
+    with transaction() as conn:
+        released = _release_lease(conn, team_id, status, failure_reason, worker_id)
+        if released and phase_timings is not None:
+            _save_phase_timings(conn, team_id, 'failed' if status == QueueStatus.FAILED else 'completed', phase_timings)
+    if released:
+        data_version.bump(data_version.QUEUE)
+    return released
+
+RESULT_DETAIL_FIELDS = BENCHMARK_FIELDS + REQUEST_STATS_FIELDS + SCORE_FIELDS
+
+SAVE_RESULT_SQL = f"""
+    INSERT INTO results (team_id, accuracy, f1_score, latency_ms, {", ".join(RESULT_DETAIL_FIELDS)}, evaluated_at)
+    VALUES (?, ?, ?, ?, {", ".join("?" for _ in RESULT_DETAIL_FIELDS)}, CURRENT_TIMESTAMP)
+    ON CONFLICT(team_id) DO UPDATE SET
+        accuracy = excluded.accuracy, f1_score = excluded.f1_score, latency_ms = excluded.latency_ms,
+        {", ".join(f"{field} = excluded.{field}" for field in RESULT_DETAIL_FIELDS)},
+        evaluated_at = CURRENT_TIMESTAMP
+"""
+
+def _save_result(conn, team_id: str, accuracy: float, f1_score: float, latency_ms: float, benchmark: Optional[Dict], request_stats: Optional[Dict], scores: Optional[Dict]):
+    conn.execute(
+        SAVE_RESULT_SQL,
+        [team_id, accuracy, f1_score, latency_ms]
+        + [(benchmark or {}).get(field) for field in BENCHMARK_FIELDS]
+        + [(request_stats or {}).get(field) for field in REQUEST_STATS_FIELDS]
+        + [(scores or {}).get(field) for field in SCORE_FIELDS]
     )
-    row = cursor.fetchone()
-    conn.close()
-    
-    return row[0] if row else None
 
-def update_queue_status(team_id: str, status: QueueStatus, failure_reason: Optional[str] = None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "UPDATE queue SET status = ?, failure_reason = ? WHERE team_id = ?",
-        (status.value, failure_reason, team_id)
+def _save_predictions(conn, team_id: str, predictions: List[int]):
+    conn.execute(
+        """
+        INSERT INTO predictions (team_id, predictions) VALUES (?, ?)
+        ON CONFLICT(team_id) DO UPDATE SET predictions = excluded.predictions, saved_at = CURRENT_TIMESTAMP
+        """,
+        (team_id, encode_predictions(predictions))
     )
-    
-    conn.commit()
-    conn.close()
 
-def save_result(team_id: str, accuracy: float, f1_score: float, latency_ms: float):
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute(
-            "INSERT INTO results (team_id, accuracy, f1_score, latency_ms) VALUES (?, ?, ?, ?)",
-            (team_id, accuracy, f1_score, latency_ms)
-        )
-    except sqlite3.IntegrityError:
-        cursor.execute(
-            "UPDATE results SET accuracy = ?, f1_score = ?, latency_ms = ?, evaluated_at = CURRENT_TIMESTAMP WHERE team_id = ?",
-            (accuracy, f1_score, latency_ms, team_id)
-        )
-    
-    conn.commit()
-    conn.close()
+def get_all_predictions() -> Dict[str, np.ndarray]:
+    with connection() as conn:
+        rows = conn.execute("SELECT team_id, predictions FROM predictions").fetchall()
+    return {team_id: decode_predictions(predictions) for team_id, predictions in rows}
 
-def get_leaderboard() -> List[LeaderboardEntry]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT t.team_id, t.team_name, r.accuracy, r.f1_score, r.latency_ms, r.evaluated_at
-        FROM results r
-        JOIN teams t ON r.team_id = t.team_id
-        ORDER BY r.accuracy DESC, r.f1_score DESC, r.evaluated_at ASC
-    """)
-    
-    rows = cursor.fetchall()
-    conn.close()
-    
-    leaderboard = []
-    for idx, row in enumerate(rows, 1):
-        leaderboard.append(LeaderboardEntry(
-            rank=idx,
-            team_id=row[0],
-            team_name=row[1],
-            accuracy=row[2],
-            f1_score=row[3],
-            latency_ms=row[4],
-            evaluated_at=datetime.fromisoformat(row[5])
-        ))
-    
-    return leaderboard
+def watch_predictions(callback):
+    # No change listeners; the prediction index loads from get_all_predictions instead
+    return None
 
-def get_team_result(team_id: str) -> Optional[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT team_name, endpoint_url FROM teams WHERE team_id = ?",
-        (team_id,)
+def _save_plagiarism(conn, team_id: str, plagiarism_cases: List[Dict], is_flagged: bool):
+    conn.execute(
+        """
+        INSERT INTO plagiarism (team_id, is_flagged, plagiarism_cases) VALUES (?, ?, ?)
+        ON CONFLICT(team_id) DO UPDATE SET
+            is_flagged = excluded.is_flagged, plagiarism_cases = excluded.plagiarism_cases, checked_at = CURRENT_TIMESTAMP
+        """,
+        (team_id, int(is_flagged), json.dumps(plagiarism_cases))
     )
-    team_row = cursor.fetchone()
-    
-    if not team_row:
-        conn.close()
-        return None
-    
-    cursor.execute(
-        "SELECT status, failure_reason FROM queue WHERE team_id = ?",
-        (team_id,)
-    )
-    queue_row = cursor.fetchone()
-    
-    cursor.execute(
-        "SELECT accuracy, f1_score, latency_ms, evaluated_at FROM results WHERE team_id = ?",
-        (team_id,)
+
+def _save_phase_timings(conn, team_id: str, outcome: str, phase_timings: Dict):
+    conn.execute(
+        """
+        INSERT INTO evaluation_timings (team_id, outcome, phase_timings) VALUES (?, ?, ?)
+        ON CONFLICT(team_id) DO UPDATE SET
+            outcome = excluded.outcome, phase_timings = excluded.phase_timings, recorded_at = CURRENT_TIMESTAMP
+        """,
+        (team_id, outcome, json.dumps(phase_timings))
     )
-    result_row = cursor.fetchone()
+
+def commit_evaluations(outcomes: List[Dict], worker_id: str = WORKER_ID) -> List[bool]:
+    """
+    Write the result, benchmark, predictions, plagiarism report and COMPLETED status
+    of one or more finished evaluations in a single transaction. Returns, per outcome,
+    whether it was written: evaluations whose lease this worker no longer holds are dropped.
+    """
+    if not outcomes:
+        return []
+    
+    committed = []
+    with transaction() as conn:
+        for outcome in outcomes:
+            team_id = outcome['team_id']
+            # Status first: it is the lease check that decides whether anything else is written
+            committed.append(_release_lease(conn, team_id, QueueStatus.COMPLETED, None, worker_id))
+            if not committed[-1]:
+                continue
+            _save_result(conn, team_id, outcome['accuracy'], outcome['f1_score'], outcome['latency_ms'], outcome.get('benchmark'), outcome.get('request_stats'), outcome.get('scores'))
+            _save_predictions(conn, team_id, outcome['predictions'])
+            if outcome.get('phase_timings') is not None:
+                _save_phase_timings(conn, team_id, 'completed', outcome['phase_timings'])
+            _save_plagiarism(conn, team_id, outcome['plagiarism_cases'], outcome['is_flagged'])
+    
+    for outcome, written in zip(outcomes, committed):
+        if written:
+            rank_index.update(outcome['team_id'], outcome['accuracy'], outcome['f1_score'], outcome['latency_ms'])
+    if any(committed):
+        data_version.bump(data_version.LEADERBOARD, data_version.PLAGIARISM, data_version.QUEUE)
+    return committed
+
+def get_plagiarism_data(team_id: str) -> Optional[Dict]:
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT team_id, is_flagged, plagiarism_cases, checked_at FROM plagiarism WHERE team_id = ?",
+            (team_id,)
+        ).fetchone()
     
-    conn.close()
+    if row:
+        return {
+            'team_id': row[0],
+            'is_flagged': bool(row[1]),
+            'plagiarism_cases': json.loads(row[2]),
+            'checked_at': _timestamp(row[3])
+        }
+    return None
+
+def get_all_plagiarism_flags() -> Dict[str, bool]:
+    with connection() as conn:
+        rows = conn.execute("SELECT team_id, is_flagged FROM plagiarism").fetchall()
+    return {team_id: bool(is_flagged) for team_id, is_flagged in rows}
+
+LEADERBOARD_SQL = f"""
+    SELECT t.team_id, t.team_name, r.accuracy, r.f1_score, r.latency_ms, r.evaluated_at,
+           {", ".join(f"r.{field}" for field in BENCHMARK_FIELDS)},
+           p.is_flagged, p.plagiarism_cases
+    FROM results r
+    JOIN teams t ON r.team_id = t.team_id
+    LEFT JOIN plagiarism p ON p.team_id = r.team_id
+    ORDER BY r.accuracy DESC, r.f1_score DESC, r.latency_ms ASC, r.team_id ASC
+"""
+
+def get_leaderboard_entries() -> List[Dict]:
+    with connection() as conn:
+        rows = conn.execute(LEADERBOARD_SQL).fetchall()
+    
+    entries = []
+    for row in rows:
+        benchmark = row[6:6 + len(BENCHMARK_FIELDS)]
+        is_flagged, plagiarism_cases = row[6 + len(BENCHMARK_FIELDS):]
+        entries.append({
+            'team_id': row[0],
+            'team_name': row[1],
+            'accuracy': row[2],
+            'f1_score': row[3],
+            'latency_ms': row[4],
+            'evaluated_at': _timestamp(row[5]),
+            **dict(zip(BENCHMARK_FIELDS, benchmark)),
+            **plagiarism_summary_fields(json.loads(plagiarism_cases or '[]'), bool(is_flagged))
+        })
+    return entries
+
+def rebuild_leaderboard() -> List[Dict]:
+    # The leaderboard is a query here, so rebuilding only invalidates cached copies
+    rank_index.load()
+    data_version.bump(data_version.LEADERBOARD)
+    return get_leaderboard_entries()
+
+def get_leaderboard() -> List[LeaderboardEntry]:
+    return leaderboard_entries_to_models(get_leaderboard_entries())
+
+def _load_ranked_results():
+    with connection() as conn:
+        return conn.execute(
+            "SELECT r.team_id, r.accuracy, r.f1_score, r.latency_ms FROM results r JOIN teams t ON r.team_id = t.team_id"
+        ).fetchall()
+
+rank_index = RankIndex(_load_ranked_results, max_age=RANK_INDEX_MAX_AGE)
+
+def get_team_result(team_id: str) -> Optional[dict]:
+    with connection() as conn:
+        team_row = conn.execute("SELECT team_name FROM teams WHERE team_id = ?", (team_id,)).fetchone()
+        if not team_row:
+            return None
+        
+        queue_row = conn.execute("SELECT status FROM queue WHERE team_id = ?", (team_id,)).fetchone()
+        result_row = conn.execute(
+            f"SELECT accuracy, f1_score, latency_ms, evaluated_at, {', '.join(REQUEST_STATS_FIELDS + SCORE_FIELDS)} FROM results WHERE team_id = ?",
+            (team_id,)
+        ).fetchone()
     
     result = {
         "team_id": team_id,
@@ -227,24 +492,34 @@ def get_team_result(team_id: str) -> Optional[dict]:
         "accuracy": result_row[0] if result_row else None,
         "f1_score": result_row[1] if result_row else None,
         "latency_ms": result_row[2] if result_row else None,
-        "evaluated_at": datetime.fromisoformat(result_row[3]) if result_row else None,
+        "evaluated_at": _timestamp(result_row[3]) if result_row else None,
+        **dict(zip(REQUEST_STATS_FIELDS + SCORE_FIELDS, result_row[4:] if result_row else [None] * len(REQUEST_STATS_FIELDS + SCORE_FIELDS)))
     }
     
     if result["status"] == QueueStatus.COMPLETED.value and result_row:
-        leaderboard = get_leaderboard()
-        for entry in leaderboard:
-            if entry.team_id == team_id:
-                result["rank"] = entry.rank
-                break
+        result["rank"] = rank_index.rank(team_id)
+        result["percentile"] = rank_index.percentile(team_id)
+        result["total_ranked"] = len(rank_index)
+        result["neighbours"] = rank_index.neighbours(team_id)
     
     return result
 
+def get_phase_timings(team_id: str) -> Optional[Dict]:
+    with connection() as conn:
+        row = conn.execute("SELECT outcome, phase_timings FROM evaluation_timings WHERE team_id = ?", (team_id,)).fetchone()
+    return {'outcome': row[0], **json.loads(row[1])} if row else None
+
+def get_all_phase_timings() -> Dict[str, Dict]:
+    with connection() as conn:
+        rows = conn.execute("SELECT team_id, outcome, phase_timings FROM evaluation_timings").fetchall()
+    return {team_id: {'outcome': outcome, **json.loads(timings)} for team_id, outcome, timings in rows}
+
 def get_team_endpoint(team_id: str) -> Optional[str]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT endpoint_url FROM teams WHERE team_id = ?", (team_id,))
-    row = cursor.fetchone()
-    conn.close()
-    
+    with connection() as conn:
+        row = conn.execute("SELECT endpoint_url FROM teams WHERE team_id = ?", (team_id,)).fetchone()
     return row[0] if row else None
+
+def verify_team_owner(team_id: str, user_id: str) -> bool:
+    with connection() as conn:
+        row = conn.execute("SELECT user_id FROM teams WHERE team_id = ?", (team_id,)).fetchone()
+    return bool(row) and row[0] == user_id
@@ -1,16 +1,22 @@
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
-from datetime import datetime
-from typing import List, Optional, Dict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Dict, Tuple
 from app.db.models import QueueStatus, TeamInDB, QueueEntry, EvaluationResult, LeaderboardEntry
-from app.config import FIREBASE_CREDENTIALS_PATH
+from app.db import data_version
+from app.db.rank_index import RankIndex
+from app.db.prediction_codec import encode_predictions, decode_predictions, predictions_hash
+from app.db.records import BENCHMARK_FIELDS, REQUEST_STATS_FIELDS, SCORE_FIELDS, leaderboard_sort_key, plagiarism_summary_fields, is_ranked_entry, leaderboard_entries_to_models
+from app.config import FIREBASE_CREDENTIALS_PATH, EVALUATION_LEASE_SECONDS, WORKER_ID, QUEUE_SEQUENCE_SHARDS, RANK_INDEX_MAX_AGE
 import os
 import json
+import random
+import numpy as np
 
 db = None
 
-def init_firebase():
-    global db
+def init_firebase_app():
+    """Initialise the firebase_admin app that Auth uses; creates no Firestore client."""
     if not firebase_admin._apps:
         # Try to load from environment variable first
         firebase_creds_json = os.getenv('FIREBASE_CREDENTIALS_JSON')
@@ -27,6 +33,11 @@ def init_firebase():
         else:
             # Use default credentials (for Google Cloud environments)
             firebase_admin.initialize_app()
+
+def init_firebase():
+    global db
+    init_firebase_app()
+    if db is None:
         db = firestore.client()
     return db
 
@@ -48,28 +59,47 @@ def add_team(team_id: str, team_name: str, endpoint_url: str, user_id: str) -> b
     }, merge=True)
     return True
 
-def add_to_queue(team_id: str) -> int:
-    db = get_db()
-    
-    queued_docs = db.collection('queue').where('status', '==', QueueStatus.QUEUED.value).stream()
-    max_position = 0
-    for doc in queued_docs:
-        pos = doc.to_dict().get('position', 0)
-        if pos > max_position:
-            max_position = pos
-    
-    position = max_position + 1
+@firestore.transactional
+def _enqueue_with_ticket(transaction, counter_ref, queue_ref, shard: int, shards: int) -> int:
+    counter = counter_ref.get(transaction=transaction)
+    value = (counter.to_dict() or {}).get('value', 0) + 1 if counter.exists else 1
+    # Interleaving the shards keeps tickets unique and close to arrival order
+    ticket = value * shards + shard
     
-    queue_ref = db.collection('queue').document(team_id)
-    queue_ref.set({
-        'team_id': team_id,
+    transaction.set(counter_ref, {'value': value})
+    transaction.set(queue_ref, {
+        'team_id': queue_ref.id,
         'status': QueueStatus.QUEUED.value,
-        'position': position,
+        'position': ticket,
         'queued_at': firestore.SERVER_TIMESTAMP,
-        'failure_reason': None
+        'failure_reason': None,
+        'lease_owner': None,
+        'lease_expires_at': None
     }, merge=True)
+    return ticket
+
+def _place_in_line(ticket: int) -> int:
+    db = get_db()
+    # Count aggregation over the (status, position) index; no queue documents are read
+    ahead = (
+        db.collection('queue')
+        .where('status', '==', QueueStatus.QUEUED.value)
+        .where('position', '<', ticket)
+        .count()
+        .get()
+    )
+    return int(ahead[0][0].value) + 1
+
+def add_to_queue(team_id: str) -> int:
+    db = get_db()
+    
+    shard = random.randrange(QUEUE_SEQUENCE_SHARDS)
+    counter_ref = db.collection('counters').document(f'queue_position_{shard}')
+    queue_ref = db.collection('queue').document(team_id)
+    ticket = _enqueue_with_ticket(db.transaction(), counter_ref, queue_ref, shard, QUEUE_SEQUENCE_SHARDS)
+    data_version.bump(data_version.QUEUE)
     
-    return position
+    return _place_in_line(ticket)
 
 def get_queue_status(team_id: str) -> Optional[QueueEntry]:
     db = get_db()
@@ -77,84 +107,322 @@ def get_queue_status(team_id: str) -> Optional[QueueEntry]:
     
     if doc.exists:
         data = doc.to_dict()
+        # The stored position is an enqueue ticket; only waiting entries have a place in line
+        position = None
+        if data['status'] == QueueStatus.QUEUED.value and data.get('position') is not None:
+            position = _place_in_line(data['position'])
         return QueueEntry(
             team_id=data['team_id'],
             status=QueueStatus(data['status']),
-            position=data.get('position'),
+            position=position,
             queued_at=data['queued_at'],
             failure_reason=data.get('failure_reason')
         )
     return None
 
-def get_next_in_queue() -> Optional[str]:
+def get_active_queue() -> Tuple[List[str], List[str]]:
+    """Team ids waiting (in queue order) and being evaluated; only document ids are transferred."""
     db = get_db()
-    
-    evaluating_docs = list(db.collection('queue').where('status', '==', QueueStatus.EVALUATING.value).limit(1).stream())
-    if evaluating_docs:
+    queue = db.collection('queue')
+    queued = queue.where('status', '==', QueueStatus.QUEUED.value).order_by('position').select([]).stream()
+    evaluating = queue.where('status', '==', QueueStatus.EVALUATING.value).select([]).stream()
+    return [doc.id for doc in queued], [doc.id for doc in evaluating]
+
+def get_queue_length() -> int:
+    db = get_db()
+    result = db.collection('queue').where('status', '==', QueueStatus.QUEUED.value).count().get()
+    return int(result[0][0].value)
+
+@firestore.transactional
+def _claim_oldest_queued(transaction, query, worker_id: str, lease_seconds: int) -> Optional[str]:
+    docs = list(query.stream(transaction=transaction))
+    if not docs:
         return None
     
-    queued_docs = list(db.collection('queue').where('status', '==', QueueStatus.QUEUED.value).stream())
+    doc = docs[0]
+    transaction.update(doc.reference, {
+        'status': QueueStatus.EVALUATING.value,
+        'lease_owner': worker_id,
+        'lease_expires_at': datetime.now(timezone.utc) + timedelta(seconds=lease_seconds),
+        'failure_reason': None
+    })
+    return doc.to_dict()['team_id']
+
+def claim_next_in_queue(worker_id: str = WORKER_ID, lease_seconds: int = EVALUATION_LEASE_SECONDS) -> Optional[str]:
+    db = get_db()
+    # Needs the (status, position) composite index from firestore.indexes.json
+    query = (
+        db.collection('queue')
+        .where('status', '==', QueueStatus.QUEUED.value)
+        .order_by('position')
+        .limit(1)
+    )
+    team_id = _claim_oldest_queued(db.transaction(), query, worker_id, lease_seconds)
+    if team_id:
+        data_version.bump(data_version.QUEUE)
+    return team_id
+
+@firestore.transactional
+def _requeue_if_expired(transaction, queue_ref, now: datetime) -> bool:
+    snapshot = queue_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        return False
     
-    if not queued_docs:
-        return None
+    data = snapshot.to_dict()
+    lease_expires_at = data.get('lease_expires_at')
+    if data.get('status') != QueueStatus.EVALUATING.value or (lease_expires_at and lease_expires_at > now):
+        return False
+    
+    transaction.update(queue_ref, {
+        'status': QueueStatus.QUEUED.value,
+        'lease_owner': None,
+        'lease_expires_at': None
+    })
+    return True
+
+def requeue_expired_leases() -> List[str]:
+    db = get_db()
+    now = datetime.now(timezone.utc)
     
-    queued_list = [{'team_id': doc.to_dict()['team_id'], 'position': doc.to_dict().get('position', 999)} for doc in queued_docs]
-    queued_list.sort(key=lambda x: x['position'])
+    # Only a handful of entries are EVALUATING at once, so the expiry check is done client-side
+    evaluating_docs = db.collection('queue').where('status', '==', QueueStatus.EVALUATING.value).stream()
     
-    if queued_list:
-        return queued_list[0]['team_id']
+    requeued = []
+    for doc in evaluating_docs:
+        lease_expires_at = doc.to_dict().get('lease_expires_at')
+        if lease_expires_at and lease_expires_at > now:
+            continue
+        if _requeue_if_expired(db.transaction(), doc.reference, now):
+            requeued.append(doc.id)
+            data_version.bump(data_version.QUEUE)
     
-    return None
+    return requeued
 
-def update_queue_status(team_id: str, status: QueueStatus, failure_reason: Optional[str] = None):
+def watch_queue(callback):
     db = get_db()
-    queue_ref = db.collection('queue').document(team_id)
-    queue_ref.update({
+    query = db.collection('queue').where('status', '==', QueueStatus.QUEUED.value)
+    try:
+        return query.on_snapshot(callback)
+    except Exception as e:
+        print(f"Error starting queue listener: {e}")
+        return None
+
+def _holds_lease(snapshot, worker_id: str) -> bool:
+    # Only the lease holder finishes an entry; a worker whose lease expired must not overwrite the new owner's outcome
+    data = snapshot.to_dict() if snapshot.exists else None
+    return bool(data) and data.get('status') == QueueStatus.EVALUATING.value and data.get('lease_owner') == worker_id
+
+@firestore.transactional
+def _renew_lease_transaction(transaction, queue_ref, worker_id: str, lease_seconds: int) -> bool:
+    if not _holds_lease(queue_ref.get(transaction=transaction), worker_id):
+        return False
+    transaction.update(queue_ref, {'lease_expires_at': datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)})
+    return True
+
+def renew_lease(team_id: str, worker_id: str = WORKER_ID, lease_seconds: int = EVALUATION_LEASE_SECONDS) -> bool:
+    """Extend a lease this worker still holds; False once it has expired and been re-queued or re-claimed."""
+    db = get_db()
+    return _renew_lease_transaction(db.transaction(), db.collection('queue').document(team_id), worker_id, lease_seconds)
+
+def _release_lease(transaction, queue_ref, status: QueueStatus, failure_reason: Optional[str]):
+    transaction.update(queue_ref, {
         'status': status.value,
-        'failure_reason': failure_reason
+        'failure_reason': failure_reason,
+        'lease_owner': None,
+        'lease_expires_at': None
     })
 
-def save_result(team_id: str, accuracy: float, f1_score: float, latency_ms: float):
+@firestore.transactional
+def _update_queue_status_transaction(transaction, team_id: str, status: QueueStatus, failure_reason: Optional[str], phase_timings: Optional[Dict], worker_id: str) -> bool:
     db = get_db()
-    result_ref = db.collection('results').document(team_id)
-    result_ref.set({
+    queue_ref = db.collection('queue').document(team_id)
+    if not _holds_lease(queue_ref.get(transaction=transaction), worker_id):
+        return False
+    
+    _release_lease(transaction, queue_ref, status, failure_reason)
+    if phase_timings is not None:
+        transaction.set(
+            db.collection('evaluation_timings').document(team_id),
+            phase_timings_document(team_id, 'failed' if status == QueueStatus.FAILED else 'completed', phase_timings)
+        )
+    return True
+
+def update_queue_status(team_id: str, status: QueueStatus, failure_reason: Optional[str] = None, phase_timings: Optional[Dict] = None, worker_id: str = WORKER_ID) -> bool:
+    released = _update_queue_status_transaction(get_db().transaction(), team_id, status, failure_reason, phase_timings, worker_id)
+    if released:
+        data_version.bump(data_version.QUEUE)
+    return released
+
+def phase_timings_document(team_id: str, outcome: str, phase_timings: Dict) -> Dict:
+    return {
         'team_id': team_id,
-        'accuracy': accuracy,
-        'f1_score': f1_score,
-        'latency_ms': latency_ms,
-        'evaluated_at': firestore.SERVER_TIMESTAMP
-    }, merge=True)
+        'outcome': outcome,
+        'phase_timings': phase_timings,
+        'recorded_at': firestore.SERVER_TIMESTAMP
+    }
 
-def save_predictions(team_id: str, predictions: List[int]):
-    db = get_db()
-    predictions_ref = db.collection('predictions').document(team_id)
-    predictions_ref.set({
+def _leaderboard_ref():
+    return get_db().collection('leaderboard').document('current')
+
+def _read_leaderboard_entries(transaction) -> List[Dict]:
+    snapshot = _leaderboard_ref().get(transaction=transaction)
+    if snapshot.exists:
+        return (snapshot.to_dict() or {}).get('entries', [])
+    # No document yet: start from every stored result, never from only the teams being written
+    return _build_leaderboard_entries(transaction)
+
+def _merge_entry(entries: List[Dict], team_id: str, fields: Dict, team_name: Optional[str] = None):
+    entry = next((e for e in entries if e['team_id'] == team_id), None)
+    if entry is None:
+        entry = {'team_id': team_id, 'is_plagiarized': False, 'plagiarism_summary': None}
+        entries.append(entry)
+    
+    entry.update(fields)
+    if team_name is not None:
+        entry['team_name'] = team_name
+    return entry
+
+def _write_leaderboard_entries(transaction, entries: List[Dict]):
+    entries.sort(key=leaderboard_sort_key)
+    transaction.set(_leaderboard_ref(), {
+        'entries': entries,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    })
+
+def _sync_rank_index(entry: Dict):
+    # The index ranks exactly the teams the leaderboard shows
+    if is_ranked_entry(entry):
+        rank_index.update(entry['team_id'], entry['accuracy'], entry.get('f1_score', 0), entry.get('latency_ms', 0))
+    else:
+        rank_index.remove(entry['team_id'])
+
+def predictions_document(team_id: str, predictions) -> Dict:
+    blob = encode_predictions(predictions)
+    return {
         'team_id': team_id,
-        'predictions': predictions,
+        'predictions_blob': blob,
+        'predictions_hash': predictions_hash(blob),
+        # Drops the int array written before predictions were stored as blobs
+        'predictions': firestore.DELETE_FIELD,
         'saved_at': firestore.SERVER_TIMESTAMP
-    }, merge=True)
+    }
+
+def predictions_from_document(data: Dict) -> Optional[np.ndarray]:
+    if data.get('predictions_blob') is not None:
+        return decode_predictions(data['predictions_blob'])
+    if data.get('predictions') is not None:
+        return np.asarray(data['predictions'])
+    return None
 
-def get_all_predictions() -> Dict[str, List[int]]:
+def get_all_predictions() -> Dict[str, np.ndarray]:
     db = get_db()
     predictions_docs = db.collection('predictions').stream()
     
     all_predictions = {}
     for doc in predictions_docs:
         data = doc.to_dict()
-        all_predictions[data['team_id']] = data['predictions']
+        predictions = predictions_from_document(data)
+        if predictions is not None:
+            all_predictions[data.get('team_id', doc.id)] = predictions
     
     return all_predictions
 
-def save_plagiarism_data(team_id: str, plagiarism_cases: List[Dict], is_flagged: bool):
+def watch_predictions(callback):
+    """Call callback({team_id: predictions}) once per snapshot; predictions is None when removed."""
+    def on_snapshot(docs, changes, read_time):
+        updates = {}
+        for change in changes:
+            data = change.document.to_dict() or {}
+            team_id = data.get('team_id', change.document.id)
+            if change.type.name == 'REMOVED':
+                updates[team_id] = None
+                continue
+            try:
+                updates[team_id] = predictions_from_document(data)
+            except ValueError as e:
+                print(f"Skipping unreadable predictions for team {team_id}: {e}")
+        # A whole snapshot at once, so the first one is applied as a complete load
+        callback(updates)
+    
+    db = get_db()
+    try:
+        return db.collection('predictions').on_snapshot(on_snapshot)
+    except Exception as e:
+        print(f"Error starting prediction listener: {e}")
+        return None
+
+@firestore.transactional
+def _commit_evaluations_transaction(transaction, outcomes: List[Dict], worker_id: str) -> Tuple[List[bool], List[Dict]]:
     db = get_db()
-    plagiarism_ref = db.collection('plagiarism').document(team_id)
     
-    plagiarism_ref.set({
-        'team_id': team_id,
-        'is_flagged': is_flagged,
-        'plagiarism_cases': plagiarism_cases,
-        'checked_at': firestore.SERVER_TIMESTAMP
-    }, merge=True)
+    # Firestore transactions need every read before the first write
+    queue_refs = [db.collection('queue').document(outcome['team_id']) for outcome in outcomes]
+    leased = {doc.id for doc in db.get_all(queue_refs, transaction=transaction) if _holds_lease(doc, worker_id)}
+    team_refs = [db.collection('teams').document(outcome['team_id']) for outcome in outcomes]
+    team_names = {
+        doc.id: doc.to_dict().get('team_name')
+        for doc in db.get_all(team_refs, transaction=transaction)
+        if doc.exists
+    }
+    entries = _read_leaderboard_entries(transaction)
+    committed = [outcome['team_id'] in leased for outcome in outcomes]
+    merged = []
+    
+    for outcome, written in zip(outcomes, committed):
+        if not written:
+            continue
+        team_id = outcome['team_id']
+        # Explicit timestamp: server timestamps are not allowed inside the leaderboard's entries array
+        result_fields = {
+            'accuracy': outcome['accuracy'],
+            'f1_score': outcome['f1_score'],
+            'latency_ms': outcome['latency_ms'],
+            'evaluated_at': datetime.now(timezone.utc),
+            **{field: (outcome.get('benchmark') or {}).get(field) for field in BENCHMARK_FIELDS}
+        }
+        merged.append(_merge_entry(
+            entries,
+            team_id,
+            {**result_fields, **plagiarism_summary_fields(outcome['plagiarism_cases'], outcome['is_flagged'])},
+            team_names.get(team_id)
+        ))
+        
+        transaction.set(db.collection('results').document(team_id), {
+            'team_id': team_id,
+            **result_fields,
+            **{field: (outcome.get('request_stats') or {}).get(field) for field in REQUEST_STATS_FIELDS},
+            **{field: (outcome.get('scores') or {}).get(field) for field in SCORE_FIELDS}
+        }, merge=True)
+        if outcome.get('phase_timings') is not None:
+            transaction.set(db.collection('evaluation_timings').document(team_id), phase_timings_document(team_id, 'completed', outcome['phase_timings']))
+        transaction.set(db.collection('predictions').document(team_id), predictions_document(team_id, outcome['predictions']), merge=True)
+        transaction.set(db.collection('plagiarism').document(team_id), {
+            'team_id': team_id,
+            'is_flagged': outcome['is_flagged'],
+            'plagiarism_cases': outcome['plagiarism_cases'],
+            'checked_at': firestore.SERVER_TIMESTAMP
+        }, merge=True)
+        _release_lease(transaction, db.collection('queue').document(team_id), QueueStatus.COMPLETED, None)
+    
+    if merged:
+        _write_leaderboard_entries(transaction, entries)
+    return committed, merged
+
+def commit_evaluations(outcomes: List[Dict], worker_id: str = WORKER_ID) -> List[bool]:
+    """
+    Write the result, benchmark, predictions, plagiarism report, leaderboard entry and COMPLETED
+    status of one or more finished evaluations in a single atomic commit. Returns, per outcome,
+    whether it was written: evaluations whose lease this worker no longer holds are dropped.
+    """
+    if not outcomes:
+        return []
+    
+    committed, merged = _commit_evaluations_transaction(get_db().transaction(), outcomes, worker_id)
+    for entry in merged:
+        _sync_rank_index(entry)
+    if merged:
+        data_version.bump(data_version.LEADERBOARD, data_version.PLAGIARISM, data_version.QUEUE)
+    return committed
 
 def get_plagiarism_data(team_id: str) -> Optional[Dict]:
     db = get_db()
@@ -175,64 +443,75 @@ def get_all_plagiarism_flags() -> Dict[str, bool]:
     
     return flags
 
-def get_leaderboard() -> List[LeaderboardEntry]:
+def _build_leaderboard_entries(transaction) -> List[Dict]:
     db = get_db()
     
-    results_docs = db.collection('results').stream()
-    plagiarism_flags = get_all_plagiarism_flags()
+    results = [doc.to_dict() for doc in db.collection('results').stream(transaction=transaction)]
+    if not results:
+        return []
+    plagiarism_docs = {doc.id: doc.to_dict() for doc in db.collection('plagiarism').stream(transaction=transaction)}
+    team_refs = [db.collection('teams').document(result_data['team_id']) for result_data in results]
+    team_names = {
+        doc.id: doc.to_dict().get('team_name')
+        for doc in db.get_all(team_refs, transaction=transaction)
+        if doc.exists
+    }
     
-    results_list = []
-    for doc in results_docs:
-        result_data = doc.to_dict()
+    entries = []
+    for result_data in results:
         team_id = result_data['team_id']
+        if team_id not in team_names:
+            continue
         
-        team_doc = db.collection('teams').document(team_id).get()
-        if team_doc.exists:
-            team_data = team_doc.to_dict()
-            
-            plagiarism_data = get_plagiarism_data(team_id)
-            is_plagiarized = plagiarism_flags.get(team_id, False)
-            plagiarism_summary = None
-            
-            if plagiarism_data and is_plagiarized:
-                cases = plagiarism_data.get('plagiarism_cases', [])
-                if cases:
-                    from app.db.models import PlagiarismSummary
-                    plagiarism_summary = PlagiarismSummary(
-                        is_flagged=True,
-                        similar_teams_count=len(cases),
-                        highest_similarity=cases[0]['similarity_score'],
-                        similar_teams=[case['team_id'] for case in cases]
-                    )
-            
-            results_list.append({
-                'team_id': team_id,
-                'team_name': team_data['team_name'],
-                'accuracy': result_data.get('accuracy', 0),
-                'f1_score': result_data.get('f1_score', 0),
-                'latency_ms': result_data.get('latency_ms', 0),
-                'evaluated_at': result_data.get('evaluated_at'),
-                'is_plagiarized': is_plagiarized,
-                'plagiarism_summary': plagiarism_summary
-            })
-    
-    results_list.sort(key=lambda x: (-x['accuracy'], -x['f1_score'], x['latency_ms']))
-    
-    leaderboard = []
-    for rank, result in enumerate(results_list, start=1):
-        leaderboard.append(LeaderboardEntry(
-            rank=rank,
-            team_id=result['team_id'],
-            team_name=result['team_name'],
-            accuracy=result['accuracy'],
-            f1_score=result['f1_score'],
-            latency_ms=result['latency_ms'],
-            evaluated_at=result['evaluated_at'],
-            is_plagiarized=result['is_plagiarized'],
-            plagiarism_summary=result['plagiarism_summary']
-        ))
+        plagiarism_data = plagiarism_docs.get(team_id) or {}
+        entry = {
+            'team_id': team_id,
+            'team_name': team_names[team_id],
+            'accuracy': result_data.get('accuracy', 0),
+            'f1_score': result_data.get('f1_score', 0),
+            'latency_ms': result_data.get('latency_ms', 0),
+            'evaluated_at': result_data.get('evaluated_at'),
+            **{field: result_data.get(field) for field in BENCHMARK_FIELDS},
+            **plagiarism_summary_fields(plagiarism_data.get('plagiarism_cases', []), plagiarism_data.get('is_flagged', False))
+        }
+        entries.append(entry)
+    return entries
+
+@firestore.transactional
+def _rebuild_leaderboard_transaction(transaction) -> List[Dict]:
+    # Reads inside the transaction, so a commit merged meanwhile makes this retry instead of being overwritten
+    entries = _build_leaderboard_entries(transaction)
+    _write_leaderboard_entries(transaction, entries)
+    return entries
+
+def rebuild_leaderboard() -> List[Dict]:
+    """Rebuild the materialised leaderboard from the results, teams and plagiarism collections."""
+    entries = _rebuild_leaderboard_transaction(get_db().transaction())
+    rank_index.load(entries_to_ranked_results(entries))
+    data_version.bump(data_version.LEADERBOARD)
+    return entries
+
+def get_leaderboard_entries() -> List[Dict]:
+    snapshot = _leaderboard_ref().get()
     
-    return leaderboard
+    if snapshot.exists:
+        return snapshot.to_dict().get('entries', [])
+    return rebuild_leaderboard()
+
+def get_leaderboard() -> List[LeaderboardEntry]:
+    return leaderboard_entries_to_models(get_leaderboard_entries())
+
+def entries_to_ranked_results(entries: List[Dict]):
+    return [
+        (entry['team_id'], entry.get('accuracy', 0), entry.get('f1_score', 0), entry.get('latency_ms', 0))
+        for entry in entries
+        if is_ranked_entry(entry)
+    ]
+
+def _load_ranked_results():
+    return entries_to_ranked_results(get_leaderboard_entries())
+
+rank_index = RankIndex(_load_ranked_results, max_age=RANK_INDEX_MAX_AGE)
 
 def get_team_result(team_id: str) -> Optional[dict]:
     db = get_db()
@@ -257,17 +536,37 @@ def get_team_result(team_id: str) -> Optional[dict]:
         "f1_score": result_data.get('f1_score'),
         "latency_ms": result_data.get('latency_ms'),
         "evaluated_at": result_data.get('evaluated_at'),
+        **{field: result_data.get(field) for field in REQUEST_STATS_FIELDS + SCORE_FIELDS}
     }
     
     if result["status"] == QueueStatus.COMPLETED.value and result_data:
-        leaderboard = get_leaderboard()
-        for entry in leaderboard:
-            if entry.team_id == team_id:
-                result["rank"] = entry.rank
-                break
+        result["rank"] = rank_index.rank(team_id)
+        result["percentile"] = rank_index.percentile(team_id)
+        result["total_ranked"] = len(rank_index)
+        result["neighbours"] = rank_index.neighbours(team_id)
     
     return result
 
+def get_phase_timings(team_id: str) -> Optional[Dict]:
+    db = get_db()
+    doc = db.collection('evaluation_timings').document(team_id).get(field_paths=['outcome', 'phase_timings'])
+    
+    if doc.exists:
+        data = doc.to_dict()
+        return {'outcome': data.get('outcome'), **(data.get('phase_timings') or {})}
+    return None
+
+def get_all_phase_timings() -> Dict[str, Dict]:
+    db = get_db()
+    timings_docs = db.collection('evaluation_timings').select(['outcome', 'phase_timings']).stream()
+    
+    all_timings = {}
+    for doc in timings_docs:
+        data = doc.to_dict() or {}
+        if data.get('phase_timings'):
+            all_timings[doc.id] = {'outcome': data.get('outcome'), **data['phase_timings']}
+    return all_timings
+
 def get_team_endpoint(team_id: str) -> Optional[str]:
     db = get_db()
     doc = db.collection('teams').document(team_id).get()
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from app.config import COMMIT_GROUP_WINDOW_MS, COMMIT_GROUP_MAX_SIZE
+
+class GroupCommitter:
+    """
+    Collects writes submitted by concurrently finishing coroutines and hands them to
+    the async `commit` function together, as one list. `commit` may return one result
+    per item, which is what that item's `submit` returns.
+    """
+    
+    def __init__(
+        self,
+        commit: Callable[[List[Any]], Awaitable[Optional[List[Any]]]],
+        window_ms: int = COMMIT_GROUP_WINDOW_MS,
+        max_size: int = COMMIT_GROUP_MAX_SIZE
+    ):
+        self.commit = commit
+        self.window = window_ms / 1000
+        self.max_size = max(1, max_size)
+        self.pending: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.Task] = None
+    
+    async def submit(self, item: Any) -> Any:
+        """Wait until `item` has been committed; raises if its commit failed."""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((item, future))
+        
+        if len(self.pending) >= self.max_size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = asyncio.create_task(self._flush_after_window())
+        
+        return await future
+    
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        self.timer = None
+        self._flush()
+    
+    def _flush(self):
+        if self.timer is not None and self.timer is not asyncio.current_task():
+            self.timer.cancel()
+            self.timer = None
+        
+        batch, self.pending = self.pending, []
+        if batch:
+            asyncio.create_task(self._commit(batch))
+    
+    async def _commit(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.commit([item for item, _ in batch])
+            for index, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(results[index] if results is not None else None)
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            # One bad write must not fail the rest of the group, so retry each on its own
+            print(f"Group commit of {len(batch)} writes failed, retrying individually: {e}")
+            await asyncio.gather(*(self._commit([entry]) for entry in batch))
+    
+    async def flush(self):
+        """Commit anything still pending, e.g. on shutdown."""
+        pending = [future for _, future in self.pending]
+        self._flush()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -23,7 +23,7 @@ class TeamInDB(BaseModel):
 class QueueEntry(BaseModel):
     team_id: str
     status: QueueStatus
-    position: int
+    position: Optional[int] = None
     queued_at: datetime
     failure_reason: Optional[str] = None
 
@@ -53,9 +53,18 @@ class LeaderboardEntry(BaseModel):
     f1_score: float
     latency_ms: float
     evaluated_at: datetime
+    latency_p50_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
+    latency_p99_ms: Optional[float] = None
+    requests_per_second: Optional[float] = None
     is_plagiarized: Optional[bool] = False
     plagiarism_summary: Optional[PlagiarismSummary] = None
 
+class LeaderboardPage(BaseModel):
+    entries: List[LeaderboardEntry]
+    total: int
+    next_cursor: Optional[str] = None
+
 class SubmitResponse(BaseModel):
     message: str
     team_id: str
@@ -68,12 +77,27 @@ class QueueStatusResponse(BaseModel):
     estimated_wait_time: Optional[int] = None
     failure_reason: Optional[str] = None
 
+class RankedNeighbour(BaseModel):
+    team_id: str
+    rank: int
+
 class TeamResultResponse(BaseModel):
     team_id: str
     team_name: str
     rank: Optional[int] = None
+    percentile: Optional[float] = None
+    total_ranked: Optional[int] = None
+    neighbours: List[RankedNeighbour] = []
     accuracy: Optional[float] = None
     f1_score: Optional[float] = None
     latency_ms: Optional[float] = None
+    request_latency_p50_ms: Optional[float] = None
+    request_latency_p95_ms: Optional[float] = None
+    request_latency_p99_ms: Optional[float] = None
+    batch_count: Optional[int] = None
+    precision: Optional[float] = None
+    recall: Optional[float] = None
+    mcc: Optional[float] = None
+    balanced_accuracy: Optional[float] = None
     status: QueueStatus
     evaluated_at: Optional[datetime] = None
@@ -0,0 +1,61 @@
+import hashlib
+import struct
+import numpy as np
+
+# Stored predictions: fixed header, then the payload.
+# Header: magic, format version, dtype code, prediction count, 16-byte BLAKE2b digest of the payload
+MAGIC = b'PRDB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBI16s')
+
+DTYPE_BITS = 0      # 0/1 labels, np.packbits (MSB first), 1 bit per prediction
+DTYPE_FLOAT16 = 1   # probabilities, little-endian float16
+
+def payload_digest(payload: bytes) -> bytes:
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+def encode_predictions(predictions) -> bytes:
+    values = np.asarray(predictions)
+    if values.ndim != 1:
+        raise ValueError("Predictions must be one-dimensional")
+    
+    is_binary = values.size == 0 or (
+        (np.issubdtype(values.dtype, np.integer) or values.dtype == bool) and np.isin(values, (0, 1)).all()
+    )
+    if is_binary:
+        dtype_code = DTYPE_BITS
+        payload = np.packbits(values != 0).tobytes()
+    elif np.issubdtype(values.dtype, np.floating):
+        dtype_code = DTYPE_FLOAT16
+        payload = values.astype('<f2').tobytes()
+    else:
+        raise ValueError(f"Cannot store predictions of dtype {values.dtype}; expected 0/1 labels or probabilities")
+    
+    return HEADER.pack(MAGIC, VERSION, dtype_code, values.size, payload_digest(payload)) + payload
+
+def read_header(blob: bytes):
+    if len(blob) < HEADER.size:
+        raise ValueError("Prediction blob is truncated")
+    
+    magic, version, dtype_code, length, digest = HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a prediction blob or unsupported version")
+    return dtype_code, length, digest
+
+def decode_predictions(blob: bytes) -> np.ndarray:
+    """Decode a stored blob straight into an array: uint8 labels or float16 probabilities."""
+    dtype_code, length, digest = read_header(blob)
+    payload = memoryview(blob)[HEADER.size:]
+    
+    if payload_digest(payload) != digest:
+        raise ValueError("Prediction blob failed its integrity check")
+    
+    if dtype_code == DTYPE_BITS:
+        return np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=length)
+    if dtype_code == DTYPE_FLOAT16:
+        return np.frombuffer(payload, dtype='<f2', count=length)
+    raise ValueError(f"Unknown prediction dtype code {dtype_code}")
+
+def predictions_hash(blob: bytes) -> str:
+    """Content hash from the header, equal for byte-identical prediction sets."""
+    return read_header(blob)[2].hex()
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sortedcontainers import SortedList
+
+# (team_id, accuracy, f1_score, latency_ms)
+RankedResult = Tuple[str, float, float, float]
+
+def rank_key(team_id: str, accuracy: float, f1_score: float, latency_ms: float) -> Tuple:
+    # Same order as the leaderboard, with team_id breaking exact ties deterministically
+    return (-(accuracy or 0), -(f1_score or 0), latency_ms or 0, team_id)
+
+class RankIndex:
+    """
+    Order-statistic index over every team's result. Rank, neighbours and percentile
+    lookups are logarithmic and never touch other teams' records in storage.
+    """
+    
+    def __init__(self, loader: Callable[[], Iterable[RankedResult]], max_age: Optional[float] = None):
+        self.loader = loader
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.keys = SortedList()
+        self.by_team: Dict[str, Tuple] = {}
+        self.loaded_at: Optional[float] = None
+    
+    def load(self, results: Optional[Iterable[RankedResult]] = None):
+        results = self.loader() if results is None else results
+        by_team = {result[0]: rank_key(*result) for result in results}
+        with self.lock:
+            self.by_team = by_team
+            self.keys = SortedList(by_team.values())
+            self.loaded_at = time.monotonic()
+    
+    def ensure_loaded(self):
+        # Without a change listener the index is reloaded after max_age to pick up other processes' writes
+        if self.loaded_at is None or (self.max_age is not None and time.monotonic() - self.loaded_at > self.max_age):
+            self.load()
+    
+    def update(self, team_id: str, accuracy: float, f1_score: float, latency_ms: float):
+        if self.loaded_at is None:
+            return
+        key = rank_key(team_id, accuracy, f1_score, latency_ms)
+        with self.lock:
+            old_key = self.by_team.get(team_id)
+            if old_key is not None:
+                self.keys.remove(old_key)
+            self.keys.add(key)
+            self.by_team[team_id] = key
+    
+    def remove(self, team_id: str):
+        with self.lock:
+            old_key = self.by_team.pop(team_id, None)
+            if old_key is not None:
+                self.keys.remove(old_key)
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def rank(self, team_id: str) -> Optional[int]:
+        self.ensure_loaded()
+        with self.lock:
+            key = self.by_team.get(team_id)
+            return self.keys.index(key) + 1 if key is not None else None
+    
+    def percentile(self, team_id: str) -> Optional[float]:
+        """Share of ranked teams placed at or below this team, so the leader is at 100."""
+        rank = self.rank(team_id)
+        if rank is None:
+            return None
+        total = len(self.keys)
+        return 100.0 * (total - rank + 1) / total
+    
+    def neighbours(self, team_id: str, count: int = 1) -> List[Dict]:
+        self.ensure_loaded()
+        with self.lock:
+            key = self.by_team.get(team_id)
+            if key is None:
+                return []
+            index = self.keys.index(key)
+            start = max(0, index - count)
+            window = self.keys[start:index + count + 1]
+        
+        return [
+            {'team_id': neighbour[3], 'rank': start + offset + 1}
+            for offset, neighbour in enumerate(window)
+            if neighbour[3] != team_id
+        ]
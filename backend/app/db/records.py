@@ -0,0 +1,58 @@
+from typing import Dict, List
+from app.db.models import LeaderboardEntry, PlagiarismSummary
+
+# Shared by the Firestore and SQLite backends so both store and rank entries identically
+
+BENCHMARK_FIELDS = [
+    'latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms',
+    'batch_latency_p50_ms', 'batch_latency_p95_ms', 'batch_latency_p99_ms',
+    'requests_per_second', 'benchmark_requests', 'benchmark_failures'
+]
+
+# Scores beyond the ranked accuracy and F1, from the same confusion matrix
+SCORE_FIELDS = ['precision', 'recall', 'mcc', 'balanced_accuracy']
+
+# How the scored evaluation requests themselves behaved: one request in single mode, one per batch in chunked mode
+REQUEST_STATS_FIELDS = ['request_latency_p50_ms', 'request_latency_p95_ms', 'request_latency_p99_ms', 'batch_count']
+
+def leaderboard_sort_key(entry: Dict):
+    # team_id breaks exact ties so the order, and so pagination cursors, are deterministic
+    return (-entry.get('accuracy', 0), -entry.get('f1_score', 0), entry.get('latency_ms', 0), entry['team_id'])
+
+def plagiarism_summary_fields(plagiarism_cases: List[Dict], is_flagged: bool) -> Dict:
+    summary = None
+    if is_flagged and plagiarism_cases:
+        summary = {
+            'is_flagged': True,
+            'similar_teams_count': len(plagiarism_cases),
+            'highest_similarity': plagiarism_cases[0]['similarity_score'],
+            'similar_teams': [case['team_id'] for case in plagiarism_cases]
+        }
+    return {'is_plagiarized': is_flagged, 'plagiarism_summary': summary}
+
+def is_ranked_entry(entry: Dict) -> bool:
+    # Entries still waiting for their result or team name are not on the leaderboard
+    return 'accuracy' in entry and bool(entry.get('team_name'))
+
+def leaderboard_entries_to_models(entries: List[Dict]) -> List[LeaderboardEntry]:
+    leaderboard = []
+    # Entries are stored ranked
+    ranked = [entry for entry in entries if is_ranked_entry(entry)]
+    for rank, entry in enumerate(ranked, start=1):
+        summary = entry.get('plagiarism_summary')
+        leaderboard.append(LeaderboardEntry(
+            rank=rank,
+            team_id=entry['team_id'],
+            team_name=entry['team_name'],
+            accuracy=entry.get('accuracy', 0),
+            f1_score=entry.get('f1_score', 0),
+            latency_ms=entry.get('latency_ms', 0),
+            evaluated_at=entry.get('evaluated_at'),
+            latency_p50_ms=entry.get('latency_p50_ms'),
+            latency_p95_ms=entry.get('latency_p95_ms'),
+            latency_p99_ms=entry.get('latency_p99_ms'),
+            requests_per_second=entry.get('requests_per_second'),
+            is_plagiarized=entry.get('is_plagiarized', False),
+            plagiarism_summary=PlagiarismSummary(**summary) if summary else None
+        ))
+    return leaderboard
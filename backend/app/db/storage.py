@@ -0,0 +1,59 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.metrics import storage_duration, storage_errors
+from app.config import STORAGE_BACKEND, STORAGE_MAX_WORKERS
+
+if STORAGE_BACKEND == "sqlite":
+    from app.db import database as backend
+    init_backend = backend.init_db
+else:
+    from app.db import firebase_service as backend
+    init_backend = backend.init_firebase
+
+# Bounded, so a slow backend queues work here instead of exhausting threads or the event loop
+executor = ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+async def run_in_storage_thread(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+def _offload(func):
+    operation = func.__name__
+    
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await run_in_storage_thread(func, *args, **kwargs)
+        except Exception:
+            storage_errors.inc(operation=operation)
+            raise
+        finally:
+            storage_duration.observe(time.perf_counter() - start, operation=operation)
+    return wrapper
+
+add_team = _offload(backend.add_team)
+add_to_queue = _offload(backend.add_to_queue)
+get_queue_status = _offload(backend.get_queue_status)
+get_queue_length = _offload(backend.get_queue_length)
+get_active_queue = _offload(backend.get_active_queue)
+claim_next_in_queue = _offload(backend.claim_next_in_queue)
+requeue_expired_leases = _offload(backend.requeue_expired_leases)
+renew_lease = _offload(backend.renew_lease)
+update_queue_status = _offload(backend.update_queue_status)
+commit_evaluations = _offload(backend.commit_evaluations)
+get_all_predictions = _offload(backend.get_all_predictions)
+get_plagiarism_data = _offload(backend.get_plagiarism_data)
+get_all_plagiarism_flags = _offload(backend.get_all_plagiarism_flags)
+rebuild_leaderboard = _offload(backend.rebuild_leaderboard)
+get_leaderboard = _offload(backend.get_leaderboard)
+get_team_result = _offload(backend.get_team_result)
+get_team_endpoint = _offload(backend.get_team_endpoint)
+get_phase_timings = _offload(backend.get_phase_timings)
+get_all_phase_timings = _offload(backend.get_all_phase_timings)
+verify_team_owner = _offload(backend.verify_team_owner)
+
+def shutdown():
+    executor.shutdown(wait=False, cancel_futures=True)
@@ -4,8 +4,10 @@ from contextlib import asynccontextmanager
 import asyncio
 import os
 from dotenv import load_dotenv
-from app.api import submit, status, leaderboard, auth, test_auth, process, plagiarism
-from app.db.firebase_service import init_firebase
+from app.api import submit, status, leaderboard, auth, test_auth, process, plagiarism, metrics, evaluations, events
+from app.db.firebase_service import init_firebase_app
+from app.db import storage
+from app.utils.http_client import init_http_client, close_http_client
 from app.config import ALLOWED_ORIGINS
 
 # Load environment variables from .env file
@@ -18,7 +20,12 @@ worker = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_firebase()
+    # Firebase Auth verifies ID tokens whichever storage backend is selected; the
+    # Firestore client is only created by the firebase backend
+    init_firebase_app()
+    storage.init_backend()
+    init_http_client()
+    events.start_publisher()
     
     # Only start background worker if not on Vercel
     if not IS_VERCEL:
@@ -32,6 +39,10 @@ async def lifespan(app: FastAPI):
     if not IS_VERCEL and worker:
         from app.core.worker import stop_worker
         await stop_worker()
+    
+    await events.stop_publisher()
+    await close_http_client()
+    storage.shutdown()
 
 app = FastAPI(
     title="ML Hackathon Evaluation Platform",
@@ -55,6 +66,9 @@ app.include_router(status.router, tags=["Status"])
 app.include_router(leaderboard.router, tags=["Leaderboard"])
 app.include_router(process.router, tags=["Queue Processing"])
 app.include_router(plagiarism.router, tags=["Plagiarism Detection"])
+app.include_router(evaluations.router, tags=["Evaluations"])
+app.include_router(events.router, tags=["Live Updates"])
+app.include_router(metrics.router, tags=["Monitoring"])
 
 @app.api_route("/", methods=["GET", "POST"])
 async def root():
@@ -65,7 +79,8 @@ async def root():
             "submit": "/submit-endpoint",
             "queue_status": "/queue-status/{team_id}",
             "leaderboard": "/leaderboard",
-            "team_result": "/team-result/{team_id}"
+            "team_result": "/team-result/{team_id}",
+            "events": "/events"
         }
     }
 
@@ -0,0 +1,84 @@
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from fastapi import Request, Response
+from app.db import data_version
+from app.config import HTTP_CACHE_MAX_AGE, HTTP_CACHE_REVALIDATE_SECONDS, HTTP_CACHE_MAX_ENTRIES
+
+class CachedBody:
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.built_at = time.monotonic()
+
+_cache: "OrderedDict[str, CachedBody]" = OrderedDict()
+_lock = threading.Lock()
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def _lookup(key: str, version: int) -> Optional[CachedBody]:
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if entry.version != version or time.monotonic() - entry.built_at > HTTP_CACHE_REVALIDATE_SECONDS:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return entry
+
+def _store(key: str, version: int, body: bytes) -> CachedBody:
+    entry = CachedBody(version, body)
+    with _lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > HTTP_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return entry
+
+def invalidate(key: Optional[str] = None):
+    with _lock:
+        if key is None:
+            _cache.clear()
+        else:
+            _cache.pop(key, None)
+
+async def cached_json_response(
+    request: Request,
+    scope: str,
+    build: Callable,
+    key: Optional[str] = None,
+    private: bool = False
+) -> Response:
+    """
+    Serve a JSON body built by `build` (bytes, sync or async) from the in-process cache while the
+    scope's data version is unchanged, answering If-None-Match with 304 without touching storage.
+    """
+    key = key or scope
+    # Read the version before building so a write racing the build invalidates the new entry
+    version = data_version.current(scope)
+    entry = _lookup(key, version)
+    
+    if entry is None:
+        body = build()
+        if inspect.isawaitable(body):
+            body = await body
+        entry = _store(key, version, body)
+    
+    headers = {
+        'ETag': entry.etag,
+        'Cache-Control': f"{'private' if private else 'public'}, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+    }
+    
+    if etag_matches(request.headers.get('if-none-match'), entry.etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=entry.body, media_type='application/json', headers=headers)
@@ -1,27 +1,180 @@
+import asyncio
 import httpx
 import time
-from typing import Optional, Dict, Any
+import numpy as np
+from typing import Optional, Dict, Any, Tuple, Union
+from app.config import (
+    EVALUATION_MAX_RESPONSE_BYTES,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_ENABLE_HTTP2
+)
+from app.utils.metrics import endpoint_requests, stage_duration, stage_total
+from app.utils.response_parser import PredictionStreamParser, ResponseParseError
+
+client: Optional[httpx.AsyncClient] = None
+host_semaphores: Dict[str, asyncio.Semaphore] = {}
+# When each host last answered a request; its pooled connection stays open for HTTP_KEEPALIVE_EXPIRY
+host_last_used: Dict[str, float] = {}
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def init_http_client() -> httpx.AsyncClient:
+    global client
+    if client is None or client.is_closed:
+        http2 = HTTP_ENABLE_HTTP2 and _http2_available()
+        if HTTP_ENABLE_HTTP2 and not http2:
+            print("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+
+        client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            follow_redirects=True
+        )
+    return client
+
+def get_http_client() -> httpx.AsyncClient:
+    if client is None or client.is_closed:
+        return init_http_client()
+    return client
+
+async def close_http_client():
+    global client
+    if client is not None:
+        await client.aclose()
+        client = None
+    host_semaphores.clear()
+    host_last_used.clear()
+
+def host_key(url: str) -> str:
+    parsed = httpx.URL(url)
+    return f"{parsed.scheme}://{parsed.host}:{parsed.port}"
+
+def host_slot(url: str) -> asyncio.Semaphore:
+    # httpx only limits connections globally, so cap concurrent requests per host here
+    key = host_key(url)
+    semaphore = host_semaphores.get(key)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(HTTP_MAX_CONNECTIONS_PER_HOST)
+        host_semaphores[key] = semaphore
+    return semaphore
+
+def mark_host_used(url: str):
+    host_last_used[host_key(url)] = time.monotonic()
+
+def has_idle_connection(url: str) -> bool:
+    last_used = host_last_used.get(host_key(url))
+    return last_used is not None and time.monotonic() - last_used < HTTP_KEEPALIVE_EXPIRY
+
+async def warmup_connection(endpoint_url: str, timeout: float = 5) -> bool:
+    """
+    Open a pooled connection to the endpoint's host so the timed call skips the TCP/TLS handshake.
+    Skipped while an earlier request's connection is still kept alive. Any HTTP answer, including
+    a 405 from a POST-only server, means the connection is open.
+    """
+    if has_idle_connection(endpoint_url):
+        return True
+    try:
+        async with host_slot(endpoint_url):
+            await get_http_client().head(endpoint_url, timeout=timeout)
+        mark_host_used(endpoint_url)
+        return True
+    except httpx.HTTPError as e:
+        print(f"Connection warmup failed for {host_key(endpoint_url)}: {e}")
+        return False
+
+async def read_predictions(response: httpx.Response, expected: Optional[int] = None, max_bytes: int = EVALUATION_MAX_RESPONSE_BYTES) -> Tuple[np.ndarray, float]:
+    """Stream a response body through the predictions parser; returns the predictions and seconds spent parsing."""
+    declared = response.headers.get('Content-Length', '')
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise ResponseParseError(f"Response of {declared} bytes exceeds the {max_bytes} byte limit")
+
+    parser = PredictionStreamParser(expected)
+    received = 0
+    parse_seconds = 0.0
+    # Decoded bytes are counted, so a compressed body cannot expand past the limit either
+    async for chunk in response.aiter_bytes():
+        received += len(chunk)
+        if received > max_bytes:
+            raise ResponseParseError(f"Response exceeds the {max_bytes} byte limit")
+        if parser.done:
+            # The rest of the body is only drained so the connection can go back to the pool
+            continue
+        parse_start = time.perf_counter()
+        parser.feed(chunk)
+        parse_seconds += time.perf_counter() - parse_start
+
+    if not parser.done:
+        parser.feed(b'', final=True)
+    return parser.predictions(), parse_seconds
+
+async def call_team_endpoint(
+    endpoint_url: str,
+    payload: Union[Dict[str, Any], bytes],
+    timeout: int = 5,
+    max_retries: int = 1,
+    headers: Optional[Dict[str, str]] = None,
+    warmup: bool = False,
+    expected_predictions: Optional[int] = None,
+    max_bytes: int = EVALUATION_MAX_RESPONSE_BYTES
+) -> Optional[Dict[str, Any]]:
+    """
+    POST the payload and parse `predictions` from the streamed response into a NumPy array.
+    Returns None when no successful response arrives, or {'error': ...} when the response
+    is unusable (too large, malformed, more than `expected_predictions` items); those are not retried.
+    """
+    http_client = get_http_client()
+    if warmup:
+        await warmup_connection(endpoint_url, timeout=timeout)
+
+    # Pre-encoded JSON bodies are sent as-is instead of being re-serialised per attempt
+    if isinstance(payload, bytes):
+        request_kwargs = {'content': payload, 'headers': {'Content-Type': 'application/json', **(headers or {})}}
+    else:
+        request_kwargs = {'json': payload, 'headers': headers}
 
-async def call_team_endpoint(endpoint_url: str, payload: Dict[str, Any], timeout: int = 5, max_retries: int = 1) -> Optional[Dict[str, Any]]:
     for attempt in range(max_retries + 1):
+        outcome = 'error'
+        start_time = time.perf_counter()
         try:
-            start_time = time.time()
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(endpoint_url, json=payload)
-                latency = (time.time() - start_time) * 1000
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    result['latency_ms'] = latency
-                    return result
-                else:
-                    if attempt == max_retries:
-                        return None
+            async with host_slot(endpoint_url):
+                start_time = time.perf_counter()
+                async with http_client.stream('POST', endpoint_url, timeout=timeout, **request_kwargs) as response:
+                    mark_host_used(endpoint_url)
+                    if response.status_code == 200:
+                        predictions, parse_seconds = await read_predictions(response, expected_predictions, max_bytes)
+                        # Body download counts towards latency; parsing it does not
+                        latency = (time.perf_counter() - start_time - parse_seconds) * 1000
+                        outcome = 'ok'
+                        return {'predictions': predictions, 'latency_ms': latency, 'parse_ms': parse_seconds * 1000}
+
+            outcome = 'http_error'
+            if attempt == max_retries:
+                return None
+        except ResponseParseError as e:
+            outcome = 'invalid_response'
+            return {'error': str(e)}
         except httpx.TimeoutException:
+            outcome = 'timeout'
             if attempt == max_retries:
                 return None
         except Exception as e:
             if attempt == max_retries:
                 return None
-    
+        finally:
+            endpoint_requests.inc(outcome=outcome)
+            stage_duration.observe(time.perf_counter() - start_time, stage='endpoint_call')
+            stage_total.inc(stage='endpoint_call', outcome='ok' if outcome == 'ok' else 'error')
+
     return None
@@ -0,0 +1,167 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers fast storage reads through slow team endpoints
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+registry: List["Metric"] = []
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric(ABC):
+    kind = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        registry.append(self)
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+    
+    @abstractmethod
+    def samples(self) -> List[str]:
+        ...
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = list(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Gauge(Metric):
+    kind = 'gauge'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        # Unlabelled gauges report 0 before their first update
+        self.values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0}
+    
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+    
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = list(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+class Histogram(Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), sum
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = ([0] * (len(self.buckets) + 1), [0.0])
+                self.values[key] = state
+            state[0][index] += 1
+            state[1][0] += value
+    
+    def mean(self, **labels) -> Optional[float]:
+        """Mean observed value, or None before the first observation."""
+        with self.lock:
+            state = self.values.get(self._key(labels))
+            if state is None or not sum(state[0]):
+                return None
+            return state[1][0] / sum(state[0])
+    
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self.values.items()]
+        
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+def render_metrics() -> str:
+    return '\n'.join(metric.render() for metric in registry) + '\n'
+
+# Pipeline metrics. Stages: enqueue, claim, endpoint_call, scoring, plagiarism, storage_write
+stage_duration = Histogram('portal_stage_duration_seconds', 'Time spent in each evaluation pipeline stage', ['stage'])
+stage_total = Counter('portal_stage_total', 'Evaluation pipeline stage executions by outcome', ['stage', 'outcome'])
+endpoint_requests = Counter('portal_endpoint_requests_total', 'Team endpoint request attempts by outcome', ['outcome'])
+evaluations_total = Counter('portal_evaluations_total', 'Finished evaluations by outcome', ['outcome'])
+evaluation_duration = Histogram('portal_evaluation_duration_seconds', 'Time from claim to final status for one evaluation')
+storage_duration = Histogram('portal_storage_operation_duration_seconds', 'Storage backend call latency', ['operation'])
+storage_errors = Counter('portal_storage_errors_total', 'Storage backend calls that raised', ['operation'])
+queue_length = Gauge('portal_queue_length', 'Teams waiting in the evaluation queue')
+active_evaluations = Gauge('portal_active_evaluations', 'Evaluations in progress in this process')
+
+@contextmanager
+def track_stage(stage: str):
+    """Time a pipeline stage and count it as ok or error depending on whether it raised."""
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        stage_duration.observe(time.perf_counter() - start, stage=stage)
+        stage_total.inc(stage=stage, outcome=outcome)
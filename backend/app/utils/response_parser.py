@@ -0,0 +1,170 @@
+import json
+import re
+import numpy as np
+from typing import Optional
+
+# One JSON token, with leading whitespace: string, bracket, separator, or a bare literal (number/true/false/null)
+TOKEN = re.compile(rb'\s*(?:("(?:[^"\\]|\\.)*")|([\[{])|([\]}])|([,:])|([^\s"\[\]{},:]+))')
+WHITESPACE = re.compile(rb'\s*')
+NUMBER = rb'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?'
+JSON_NUMBER = re.compile(NUMBER)
+# A run of complete numeric array items, each followed by a comma, converted in one NumPy call
+ITEM_RUN = re.compile(rb'(?:\s*' + NUMBER + rb'\s*,)+')
+STRING, OPEN, CLOSE, SEPARATOR, LITERAL = 1, 2, 3, 4, 5
+# Inside the predictions array: what the next token may be
+FIRST_ITEM, ITEM, AFTER_ITEM = 'first_item', 'item', 'after_item'
+
+class ResponseParseError(ValueError):
+    pass
+
+class PredictionStreamParser:
+    """
+    Incremental parser for `{"predictions": [...], ...}` response bodies.
+    Predictions are written straight into a float64 buffer as chunks arrive; other
+    top-level fields are skipped without being decoded. Reading can stop as soon
+    as the array closes, or as soon as it holds more than `expected` items.
+    """
+    
+    def __init__(self, expected: Optional[int] = None):
+        self.expected = expected
+        self.values = np.empty(expected if expected is not None else 1024, dtype=np.float64)
+        self.count = 0
+        self.buffer = b''
+        self.depth = 0
+        self.key: Optional[str] = None
+        self.expecting_key = False
+        self.in_predictions = False
+        self.array_state = FIRST_ITEM
+        self.done = False
+    
+    def feed(self, chunk: bytes, final: bool = False) -> bool:
+        """Consume a chunk; returns True once the predictions array is complete."""
+        data = self.buffer + chunk
+        pos = 0
+        while not self.done:
+            if self.in_predictions and self.array_state != AFTER_ITEM:
+                run = ITEM_RUN.match(data, pos)
+                if run:
+                    self.extend(data[pos:run.end()].split(b',')[:-1])
+                    self.array_state = ITEM
+                    pos = run.end()
+                    continue
+            
+            match = TOKEN.match(data, pos)
+            if match is None:
+                # Only an unterminated string fails to match; it may close in the next chunk
+                if final and WHITESPACE.match(data, pos).end() < len(data):
+                    raise ResponseParseError("Response is not valid JSON")
+                break
+            # A literal touching the end of the data may continue in the next chunk
+            if match.lastindex == LITERAL and match.end() == len(data) and not final:
+                break
+            pos = match.end()
+            self.token(match.lastindex, match.group(match.lastindex))
+        
+        self.buffer = data[pos:]
+        if final and not self.done:
+            if self.in_predictions:
+                raise ResponseParseError("Response ended before predictions closed")
+            if self.depth > 0:
+                raise ResponseParseError("Response ended before the JSON object closed")
+            raise ResponseParseError("Response missing 'predictions' field")
+        return self.done
+    
+    def token(self, kind: int, value: bytes):
+        if self.depth == 0:
+            if value != b'{':
+                raise ResponseParseError("Response is not a JSON object")
+            self.depth = 1
+            self.expecting_key = True
+            return
+        
+        if self.in_predictions:
+            self.array_token(kind, value)
+            return
+        
+        if self.depth > 1:
+            # Inside a nested value that is being skipped
+            if kind == OPEN:
+                self.depth += 1
+            elif kind == CLOSE:
+                self.depth -= 1
+                self.expecting_key = self.depth == 1
+            return
+        
+        if self.expecting_key:
+            if kind == STRING:
+                self.key = json.loads(value)
+                self.expecting_key = False
+            elif value == b'}':
+                self.depth = 0
+            elif value != b',':
+                raise ResponseParseError("Response is not valid JSON")
+            return
+        
+        if value == b':':
+            return
+        if self.key == 'predictions':
+            if value != b'[':
+                raise ResponseParseError("Predictions must be a list")
+            self.in_predictions = True
+            self.array_state = FIRST_ITEM
+            self.depth = 2
+        elif kind == OPEN:
+            self.depth += 1
+        else:
+            self.expecting_key = True
+    
+    def array_token(self, kind: int, value: bytes):
+        if kind == LITERAL:
+            if self.array_state == AFTER_ITEM:
+                raise ResponseParseError("Predictions are missing a comma between items")
+            self.append(value)
+            self.array_state = AFTER_ITEM
+        elif value == b',':
+            if self.array_state != AFTER_ITEM:
+                raise ResponseParseError("Predictions contain an empty item")
+            self.array_state = ITEM
+        elif value == b']':
+            if self.array_state == ITEM:
+                raise ResponseParseError("Predictions end with a trailing comma")
+            self.in_predictions = False
+            self.done = True
+        else:
+            raise ResponseParseError("Predictions must be numbers or booleans")
+    
+    def extend(self, literals):
+        # Items matched JSON_NUMBER already; only overflow to infinity is left to reject
+        values = np.array(literals, dtype=np.bytes_).astype(np.float64)
+        if not np.isfinite(values).all():
+            raise ResponseParseError("Predictions must be finite numbers")
+        
+        end = self.count + len(values)
+        if end > len(self.values):
+            if self.expected is not None:
+                raise ResponseParseError(f"Expected {self.expected} predictions, got more")
+            self.values = np.resize(self.values, max(end, 2 * len(self.values)))
+        self.values[self.count:end] = values
+        self.count = end
+    
+    def append(self, literal: bytes):
+        if literal == b'true':
+            value = 1.0
+        elif literal == b'false':
+            value = 0.0
+        elif JSON_NUMBER.fullmatch(literal):
+            value = float(literal)
+            if not np.isfinite(value):
+                raise ResponseParseError("Predictions must be finite numbers")
+        else:
+            raise ResponseParseError("Predictions must be numbers or booleans")
+        
+        if self.count == len(self.values):
+            if self.expected is not None:
+                raise ResponseParseError(f"Expected {self.expected} predictions, got more")
+            self.values = np.resize(self.values, 2 * len(self.values))
+        self.values[self.count] = value
+        self.count += 1
+    
+    def predictions(self) -> np.ndarray:
+        return self.values[:self.count]
@@ -0,0 +1,44 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+class PhaseTimer:
+    """Structured timing spans for one evaluation, in milliseconds from the timer's creation."""
+    
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Dict] = []
+    
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+    
+    def record(self, name: str, start: float, end: float):
+        """Add a span from two perf_counter readings."""
+        self.spans.append({
+            'phase': name,
+            'start_ms': round((start - self.origin) * 1000, 3),
+            'duration_ms': round(max(0.0, end - start) * 1000, 3)
+        })
+    
+    def add(self, name: str, duration_ms: float, start: Optional[float] = None):
+        """Add a span measured elsewhere, e.g. JSON parsing summed over several responses."""
+        start = self.origin if start is None else start
+        self.record(name, start, start + duration_ms / 1000)
+    
+    def totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span['phase']] = round(totals.get(span['phase'], 0.0) + span['duration_ms'], 3)
+        return totals
+    
+    def to_dict(self) -> Dict:
+        return {
+            'total_ms': round((time.perf_counter() - self.origin) * 1000, 3),
+            'phases': self.totals(),
+            'spans': list(self.spans)
+        }
@@ -1,26 +1,116 @@
+import asyncio
+import json
+import time
 import httpx
-from typing import Tuple
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.utils.http_client import get_http_client, host_slot, mark_host_used, read_predictions
+from app.utils.response_parser import ResponseParseError
+from app.data.test_data import TEST_DATA
+from app.config import (
+    ENDPOINT_VALIDATION_PROBE_SIZE,
+    ENDPOINT_VALIDATION_TIMEOUT,
+    ENDPOINT_VALIDATION_CACHE_TTL,
+    ENDPOINT_VALIDATION_FAILURE_TTL,
+    ENDPOINT_VALIDATION_CACHE_SIZE,
+    ENDPOINT_VALIDATION_MAX_RESPONSE_BYTES
+)
 
-async def validate_endpoint(url: str) -> Tuple[bool, str]:
+# A few rows in the real evaluation schema, encoded once
+PROBE_BODY = json.dumps({"inputs": TEST_DATA[:ENDPOINT_VALIDATION_PROBE_SIZE]}, separators=(',', ':')).encode('utf-8')
+PROBE_SIZE = min(ENDPOINT_VALIDATION_PROBE_SIZE, len(TEST_DATA))
+
+# Outcomes are (is_valid, message, reached): reached is False when the endpoint never answered
+_validation_cache: "OrderedDict[str, Tuple[float, Tuple[bool, str, bool]]]" = OrderedDict()
+# Concurrent submissions of the same URL share one probe
+_in_flight: Dict[str, asyncio.Task] = {}
+
+def check_url_scheme(url: str) -> Tuple[bool, str]:
     if not url.startswith("https://") and not url.startswith("http://"):
         return False, "Endpoint must use HTTP or HTTPS protocol"
-    
+    return True, "Endpoint URL is well-formed"
+
+def get_cached_validation(url: str):
+    cached = _validation_cache.get(url)
+    if cached is None:
+        return None
+    expires_at, outcome = cached
+    if expires_at <= time.monotonic():
+        del _validation_cache[url]
+        return None
+    _validation_cache.move_to_end(url)
+    return outcome
+
+def cache_validation(url: str, outcome: Tuple[bool, str, bool]):
+    ttl = ENDPOINT_VALIDATION_CACHE_TTL if outcome[0] else ENDPOINT_VALIDATION_FAILURE_TTL
+    _validation_cache[url] = (time.monotonic() + ttl, outcome)
+    _validation_cache.move_to_end(url)
+    while len(_validation_cache) > ENDPOINT_VALIDATION_CACHE_SIZE:
+        _validation_cache.popitem(last=False)
+
+async def probe_endpoint(url: str) -> Tuple[bool, str, bool]:
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.post(url, json={"inputs": [{"test": 1}]})
-            if response.status_code in [200, 201]:
-                return True, "Endpoint is reachable"
-            elif response.status_code == 405:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    return True, "Endpoint is reachable"
-                else:
-                    return False, f"Endpoint returned status code {response.status_code}"
-            else:
-                return False, f"Endpoint returned status code {response.status_code}"
+        async with host_slot(url):
+            async with get_http_client().stream(
+                'POST',
+                url,
+                content=PROBE_BODY,
+                headers={'Content-Type': 'application/json'},
+                timeout=ENDPOINT_VALIDATION_TIMEOUT
+            ) as response:
+                mark_host_used(url)
+                if response.status_code not in [200, 201]:
+                    return False, f"Endpoint returned status code {response.status_code}", True
+                predictions, _ = await read_predictions(response, PROBE_SIZE, ENDPOINT_VALIDATION_MAX_RESPONSE_BYTES)
+        
+        if len(predictions) != PROBE_SIZE:
+            return False, f"Endpoint returned {len(predictions)} predictions for {PROBE_SIZE} inputs", True
+        return True, "Endpoint is reachable and returned valid predictions", True
+    except ResponseParseError as e:
+        return False, str(e), True
     except httpx.TimeoutException:
-        return False, "Endpoint request timed out"
+        return False, "Endpoint request timed out", False
     except httpx.RequestError as e:
-        return False, f"Cannot reach endpoint: {str(e)}"
+        return False, f"Cannot reach endpoint: {str(e)}", False
     except Exception as e:
-        return False, f"Validation error: {str(e)}"
+        return False, f"Validation error: {str(e)}", False
+
+async def probe_and_cache(url: str) -> Tuple[bool, str, bool]:
+    outcome = await probe_endpoint(url)
+    cache_validation(url, outcome)
+    return outcome
+
+async def probe_cached(url: str) -> Tuple[bool, str, bool]:
+    cached = get_cached_validation(url)
+    if cached is not None:
+        return cached
+    
+    task = _in_flight.get(url)
+    if task is None:
+        task = asyncio.ensure_future(probe_and_cache(url))
+        _in_flight[url] = task
+        task.add_done_callback(lambda _: _in_flight.pop(url, None))
+    # shield: one caller going away must not cancel the probe the others are waiting on
+    return await asyncio.shield(task)
+
+async def validate_endpoint(url: str) -> Tuple[bool, str]:
+    is_valid, message = check_url_scheme(url)
+    if not is_valid:
+        return is_valid, message
+    
+    is_valid, message, _ = await probe_cached(url)
+    return is_valid, message
+
+async def prevalidate_for_evaluation(url: str) -> Optional[str]:
+    """
+    Failure reason when the endpoint answered the probe with a wrong status, schema or count.
+    An endpoint that did not answer in time is left to the evaluation, which has its own timeout and retries.
+    """
+    is_valid, message = check_url_scheme(url)
+    if not is_valid:
+        return message
+    
+    is_valid, message, reached = await probe_cached(url)
+    if is_valid or not reached:
+        return None
+    return message
@@ -0,0 +1 @@
+# Lets tests import the `app` package when pytest is run from backend/
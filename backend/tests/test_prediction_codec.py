@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from app.db.prediction_codec import HEADER, decode_predictions, encode_predictions, predictions_hash
+
+@pytest.mark.parametrize("length", [0, 1, 7, 8, 9, 1000])
+def test_binary_labels_round_trip(length):
+    labels = np.random.default_rng(length).integers(0, 2, length)
+    blob = encode_predictions(labels)
+    assert len(blob) == HEADER.size + (length + 7) // 8
+    decoded = decode_predictions(blob)
+    assert decoded.tolist() == labels.tolist()
+
+def test_booleans_round_trip_as_labels():
+    assert decode_predictions(encode_predictions(np.array([True, False, True]))).tolist() == [1, 0, 1]
+
+def test_probabilities_round_trip_at_float16_precision():
+    probabilities = np.random.default_rng(0).random(100)
+    decoded = decode_predictions(encode_predictions(probabilities))
+    assert decoded.dtype == np.float16
+    np.testing.assert_array_equal(decoded, probabilities.astype(np.float16))
+
+def test_hash_is_equal_for_identical_predictions_only():
+    labels = np.array([0, 1, 1, 0, 1])
+    assert predictions_hash(encode_predictions(labels)) == predictions_hash(encode_predictions(labels.tolist()))
+    assert predictions_hash(encode_predictions(labels)) != predictions_hash(encode_predictions(1 - labels))
+
+def test_rejects_corrupted_and_truncated_blobs():
+    blob = bytearray(encode_predictions(np.array([0, 1, 1, 0, 1, 0, 0, 1, 1])))
+    blob[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="integrity"):
+        decode_predictions(bytes(blob))
+    with pytest.raises(ValueError, match="truncated"):
+        decode_predictions(bytes(blob[:HEADER.size - 1]))
+    with pytest.raises(ValueError):
+        decode_predictions(b'XXXX' + bytes(blob[4:]))
+
+@pytest.mark.parametrize("predictions", [np.array(['a', 'b']), np.array([0, 2, 1]), np.zeros((2, 2), dtype=int)])
+def test_rejects_unsupported_predictions(predictions):
+    with pytest.raises(ValueError):
+        encode_predictions(predictions)
@@ -0,0 +1,61 @@
+import random
+import pytest
+from app.db.rank_index import RankIndex
+from app.db.records import leaderboard_sort_key
+
+def random_results(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    # Few distinct values, so ties on accuracy and F1 are common
+    return [
+        (f"team-{i:03d}", rng.choice([0.7, 0.8, 0.9]), rng.choice([0.1, 0.5]), rng.choice([10.0, 20.0, 30.0]))
+        for i in range(count)
+    ]
+
+def leaderboard_order(results):
+    entries = [
+        {'team_id': team_id, 'accuracy': accuracy, 'f1_score': f1_score, 'latency_ms': latency_ms}
+        for team_id, accuracy, f1_score, latency_ms in results
+    ]
+    return [entry['team_id'] for entry in sorted(entries, key=leaderboard_sort_key)]
+
+def test_ranks_follow_the_leaderboard_order():
+    results = random_results(200)
+    index = RankIndex(lambda: results)
+    for rank, team_id in enumerate(leaderboard_order(results), start=1):
+        assert index.rank(team_id) == rank
+
+def test_updates_and_removals_keep_the_order():
+    results = {result[0]: result for result in random_results(50, seed=1)}
+    index = RankIndex(lambda: list(results.values()))
+    index.ensure_loaded()
+    
+    rng = random.Random(2)
+    for team_id in rng.sample(sorted(results), 20):
+        results[team_id] = (team_id, rng.random(), rng.random(), rng.random() * 100)
+        index.update(*results[team_id])
+    for team_id in rng.sample(sorted(results), 5):
+        del results[team_id]
+        index.remove(team_id)
+    
+    assert len(index) == len(results)
+    for rank, team_id in enumerate(leaderboard_order(results.values()), start=1):
+        assert index.rank(team_id) == rank
+
+def test_percentile_and_neighbours():
+    index = RankIndex(lambda: [('a', 0.9, 0.5, 10), ('b', 0.8, 0.5, 10), ('c', 0.7, 0.5, 10)])
+    assert index.percentile('a') == pytest.approx(100.0)
+    assert index.percentile('c') == pytest.approx(100 / 3)
+    assert index.neighbours('b') == [{'team_id': 'a', 'rank': 1}, {'team_id': 'c', 'rank': 3}]
+    assert index.neighbours('a') == [{'team_id': 'b', 'rank': 2}]
+    assert index.rank('missing') is None
+    assert index.percentile('missing') is None
+    assert index.neighbours('missing') == []
+
+def test_reloads_after_max_age():
+    results = [('a', 0.9, 0.5, 10)]
+    index = RankIndex(lambda: list(results), max_age=60)
+    assert index.rank('a') == 1
+    results.insert(0, ('b', 0.95, 0.5, 10))
+    assert index.rank('a') == 1
+    index.loaded_at -= 61
+    assert index.rank('a') == 2
@@ -0,0 +1,121 @@
+import asyncio
+import gzip
+import json
+import httpx
+import numpy as np
+import pytest
+from app.utils.http_client import read_predictions
+from app.utils.response_parser import PredictionStreamParser, ResponseParseError
+
+def parse(body: bytes, expected=None, chunk_size=None):
+    parser = PredictionStreamParser(expected)
+    chunk_size = chunk_size or max(len(body), 1)
+    for start in range(0, len(body), chunk_size):
+        if parser.feed(body[start:start + chunk_size]):
+            return parser.predictions()
+    parser.feed(b'', final=True)
+    return parser.predictions()
+
+def test_parses_numbers_and_booleans():
+    body = b'{"predictions": [1, 0, true, false, 0.25, 1e-3, -0]}'
+    assert parse(body).tolist() == [1.0, 0.0, 1.0, 0.0, 0.25, 0.001, 0.0]
+
+def test_empty_array():
+    assert parse(b'{"predictions": []}').tolist() == []
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64])
+def test_chunk_boundaries_give_the_same_result(chunk_size):
+    predictions = [1, 0, 123456, 0.5, 1e-3, True, False] * 20
+    body = json.dumps({"id": "x", "predictions": predictions, "extra": [1, 2]}).encode()
+    assert parse(body, len(predictions), chunk_size).tolist() == [float(value) for value in predictions]
+
+def test_skips_nested_fields_and_strings_with_brackets():
+    body = json.dumps({
+        "meta": {"note": "] } [ {\"predictions\": [9]}", "predictions": [7, 7], "deep": [[{"a": "]"}]]},
+        "label": "predictions",
+        "predictions": [1, 0]
+    }).encode()
+    for chunk_size in (1, 4, None):
+        assert parse(body, 2, chunk_size).tolist() == [1.0, 0.0]
+
+def test_stops_once_the_array_closes():
+    parser = PredictionStreamParser(2)
+    assert parser.feed(b'{"predictions": [1, 0], "rest": ')
+    assert parser.predictions().tolist() == [1.0, 0.0]
+
+def test_overflow_past_expected_stops_early():
+    parser = PredictionStreamParser(3)
+    with pytest.raises(ResponseParseError, match="Expected 3 predictions"):
+        parser.feed(b'{"predictions": [1, 0, 1, 0, ')
+
+def test_overflow_on_the_single_item_path():
+    with pytest.raises(ResponseParseError, match="Expected 1 predictions"):
+        parse(b'{"predictions": [true, false]}', 1)
+
+def test_grows_without_expected_length():
+    predictions = list(range(3000))
+    body = json.dumps({"predictions": predictions}).encode()
+    assert np.array_equal(parse(body, None, 100), np.arange(3000, dtype=float))
+
+@pytest.mark.parametrize("body, message", [
+    (b'{"predictions": [1,,0]}', "empty item"),
+    (b'{"predictions": [,1]}', "empty item"),
+    (b'{"predictions": [1 0]}', "missing a comma"),
+    (b'{"predictions": [true false]}', "missing a comma"),
+    (b'{"predictions": [1, 0,]}', "trailing comma"),
+    (b'{"predictions": [NaN]}', "numbers or booleans"),
+    (b'{"predictions": [1, Infinity]}', "numbers or booleans"),
+    (b'{"predictions": [1e999, 0]}', "finite"),
+    (b'{"predictions": [1e999]}', "finite"),
+    (b'{"predictions": ["1"]}', "numbers or booleans"),
+    (b'{"predictions": [null]}', "numbers or booleans"),
+    (b'{"predictions": [[1]]}', "numbers or booleans"),
+    (b'{"predictions": [01, 0]}', "numbers or booleans"),
+    (b'{"predictions": null}', "must be a list"),
+    (b'[1, 0]', "not a JSON object"),
+    (b'{"other": 1}', "missing 'predictions'"),
+    (b'{"predictions": [1, 0, ', "ended before predictions closed"),
+    (b'{"predictions": [1, 0', "ended before predictions closed"),
+    (b'{"other": [1, 2', "ended before the JSON object closed"),
+])
+def test_rejects_malformed_bodies(body, message):
+    for chunk_size in (1, None):
+        with pytest.raises(ResponseParseError, match=message):
+            parse(body, None, chunk_size)
+
+def stream_response(chunks, headers=None):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+    return httpx.Response(200, headers=headers, content=body())
+
+def read(response, expected=None, max_bytes=1024):
+    return asyncio.run(read_predictions(response, expected, max_bytes))
+
+def test_read_predictions_streams_chunks():
+    predictions, parse_seconds = read(stream_response([b'{"predictions": [1, 0,', b' 1]}']), expected=3)
+    assert predictions.tolist() == [1.0, 0.0, 1.0]
+    assert parse_seconds >= 0
+
+def test_read_predictions_drains_after_the_array_closes():
+    chunks = [b'{"predictions": [1]', b', "padding": "' + b'x' * 100 + b'"}']
+    predictions, _ = read(stream_response(chunks))
+    assert predictions.tolist() == [1.0]
+
+def test_read_predictions_rejects_declared_length_over_limit():
+    response = stream_response([b'{"predictions": [1]}'], headers={'Content-Length': '4096'})
+    with pytest.raises(ResponseParseError, match="4096 bytes exceeds the 1024 byte limit"):
+        read(response)
+
+def test_read_predictions_counts_bytes_without_content_length():
+    chunks = [b'{"predictions": [1], "padding": "', b'x' * 2048, b'"}']
+    with pytest.raises(ResponseParseError, match="exceeds the 1024 byte limit"):
+        read(stream_response(chunks))
+
+def test_read_predictions_limits_decompressed_size():
+    body = b'{"predictions": [1], "padding": "' + b'x' * 4096 + b'"}'
+    compressed = gzip.compress(body)
+    assert len(compressed) < 1024
+    response = stream_response([compressed], headers={'Content-Encoding': 'gzip', 'Content-Length': str(len(compressed))})
+    with pytest.raises(ResponseParseError, match="exceeds the 1024 byte limit"):
+        read(response)
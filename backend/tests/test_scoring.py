@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from sklearn.metrics import (
+    accuracy_score, balanced_accuracy_score, f1_score, matthews_corrcoef, precision_score, recall_score
+)
+from app.core.scoring import as_binary_labels, score_predictions
+
+SKLEARN_METRICS = {
+    'accuracy': accuracy_score,
+    'precision': lambda y_true, y_pred: precision_score(y_true, y_pred, zero_division=0),
+    'recall': lambda y_true, y_pred: recall_score(y_true, y_pred, zero_division=0),
+    'f1_score': lambda y_true, y_pred: f1_score(y_true, y_pred, zero_division=0),
+    'mcc': matthews_corrcoef,
+    'balanced_accuracy': balanced_accuracy_score
+}
+
+def sklearn_scores(y_true, y_pred):
+    return {name: metric(y_true, y_pred) for name, metric in SKLEARN_METRICS.items()}
+
+def random_case(seed: int, size: int = 200, positive_rate: float = 0.12):
+    rng = np.random.default_rng(seed)
+    return (rng.random(size) < positive_rate).astype(int), rng.integers(0, 2, size)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_sklearn_on_random_predictions(seed):
+    y_true, y_pred = random_case(seed)
+    scores = score_predictions(y_true, y_pred)
+    for name, expected in sklearn_scores(y_true, y_pred).items():
+        assert scores[name] == pytest.approx(expected), name
+
+# sklearn warns about the single-class cases it is being compared on
+@pytest.mark.filterwarnings("ignore::UserWarning")
+@pytest.mark.parametrize("y_true,y_pred", [
+    ([0, 0, 0, 0], [0, 0, 0, 0]),  # no positives anywhere
+    ([0, 1, 0, 1], [0, 0, 0, 0]),  # nothing predicted positive
+    ([0, 0, 0, 0], [1, 0, 1, 0]),  # no true positives to recall
+    ([1, 1, 1, 1], [1, 1, 1, 1]),  # no negatives anywhere
+    ([0, 1, 0, 1], [1, 0, 1, 0]),  # every prediction wrong
+])
+def test_matches_sklearn_on_zero_division_cases(y_true, y_pred):
+    y_true, y_pred = np.array(y_true), np.array(y_pred)
+    scores = score_predictions(y_true, y_pred)
+    for name, expected in sklearn_scores(y_true, y_pred).items():
+        assert scores[name] == pytest.approx(expected), name
+
+def test_matrix_scores_match_per_row_scores():
+    y_true, _ = random_case(0)
+    matrix = np.stack([random_case(seed)[1] for seed in range(1, 6)] + [y_true, 1 - y_true])
+    scores = score_predictions(y_true, matrix)
+    for row, y_pred in enumerate(matrix):
+        for name, expected in sklearn_scores(y_true, y_pred).items():
+            assert scores[name][row] == pytest.approx(expected), (row, name)
+
+def test_booleans_are_labels():
+    assert as_binary_labels([True, False]).tolist() == [1, 0]
+
+def test_rejects_non_binary_and_mismatched_predictions():
+    with pytest.raises(ValueError):
+        score_predictions([0, 1], [0, 2])
+    with pytest.raises(ValueError):
+        score_predictions([0, 1, 0], [0, 1])